@@ -15,6 +15,11 @@ d = { 'settings': { 'branch': 'master',
                             'relax.base.BaseModule.save': ('base.html#basemodule.save', 'relax/base.py'),
                             'relax.base.PredFnMixedin': ('base.html#predfnmixedin', 'relax/base.py'),
                             'relax.base.PredFnMixedin.pred_fn': ('base.html#predfnmixedin.pred_fn', 'relax/base.py'),
+                            'relax.base.StepwiseMixedin': ('base.html#stepwisemixedin', 'relax/base.py'),
+                            'relax.base.StepwiseMixedin.cf_from_state': ('base.html#stepwisemixedin.cf_from_state', 'relax/base.py'),
+                            'relax.base.StepwiseMixedin.init_cf_state': ('base.html#stepwisemixedin.init_cf_state', 'relax/base.py'),
+                            'relax.base.StepwiseMixedin.n_steps': ('base.html#stepwisemixedin.n_steps', 'relax/base.py'),
+                            'relax.base.StepwiseMixedin.update_cf_state': ('base.html#stepwisemixedin.update_cf_state', 'relax/base.py'),
                             'relax.base.TrainableMixedin': ('base.html#trainablemixedin', 'relax/base.py'),
                             'relax.base.TrainableMixedin.is_trained': ('base.html#trainablemixedin.is_trained', 'relax/base.py'),
                             'relax.base.TrainableMixedin.train': ('base.html#trainablemixedin.train', 'relax/base.py')},
@@ -43,12 +48,21 @@ d = { 'settings': { 'branch': 'master',
                                                                                        'relax/data_module.py'),
                                    'relax.data_module.DataModule.load_from_path': ( 'data.html#datamodule.load_from_path',
                                                                                     'relax/data_module.py'),
+                                   'relax.data_module.DataModule.neighbor_index': ( 'data.html#datamodule.neighbor_index',
+                                                                                    'relax/data_module.py'),
                                    'relax.data_module.DataModule.sample': ('data.html#datamodule.sample', 'relax/data_module.py'),
                                    'relax.data_module.DataModule.save': ('data.html#datamodule.save', 'relax/data_module.py'),
                                    'relax.data_module.DataModule.set_transformations': ( 'data.html#datamodule.set_transformations',
                                                                                          'relax/data_module.py'),
                                    'relax.data_module.DataModule.transform': ('data.html#datamodule.transform', 'relax/data_module.py'),
                                    'relax.data_module.DataModuleConfig': ('data.html#datamoduleconfig', 'relax/data_module.py'),
+                                   'relax.data_module.DataModuleConfig.Config': ( 'data.html#datamoduleconfig.config',
+                                                                                  'relax/data_module.py'),
+                                   'relax.data_module.DataModuleConfig._to_index_array': ( 'data.html#datamoduleconfig._to_index_array',
+                                                                                           'relax/data_module.py'),
+                                   'relax.data_module.DataModuleConfig.load_from_json': ( 'data.html#datamoduleconfig.load_from_json',
+                                                                                          'relax/data_module.py'),
+                                   'relax.data_module.DataModuleConfig.save': ('data.html#datamoduleconfig.save', 'relax/data_module.py'),
                                    'relax.data_module.DataModuleConfig.shuffle': ( 'data.html#datamoduleconfig.shuffle',
                                                                                    'relax/data_module.py'),
                                    'relax.data_module.DataModuleInfoMixin': ('data.html#datamoduleinfomixin', 'relax/data_module.py'),
@@ -66,6 +80,24 @@ d = { 'settings': { 'branch': 'master',
                                                                                             'relax/data_module.py'),
                                    'relax.data_module.DataModuleInfoMixin.xs': ('data.html#datamoduleinfomixin.xs', 'relax/data_module.py'),
                                    'relax.data_module.DataModuleInfoMixin.ys': ('data.html#datamoduleinfomixin.ys', 'relax/data_module.py'),
+                                   'relax.data_module.NearestNeighborIndex': ('data.html#nearestneighborindex', 'relax/data_module.py'),
+                                   'relax.data_module.NearestNeighborIndex.__init__': ( 'data.html#nearestneighborindex.__init__',
+                                                                                        'relax/data_module.py'),
+                                   'relax.data_module.NearestNeighborIndex.load_from_path': ( 'data.html#nearestneighborindex.load_from_path',
+                                                                                              'relax/data_module.py'),
+                                   'relax.data_module.NearestNeighborIndex.query': ( 'data.html#nearestneighborindex.query',
+                                                                                     'relax/data_module.py'),
+                                   'relax.data_module.NearestNeighborIndex.save': ( 'data.html#nearestneighborindex.save',
+                                                                                    'relax/data_module.py'),
+                                   'relax.data_module.OutOfCoreDataModule': ('data.html#outofcoredatamodule', 'relax/data_module.py'),
+                                   'relax.data_module.OutOfCoreDataModule.__init__': ( 'data.html#outofcoredatamodule.__init__',
+                                                                                       'relax/data_module.py'),
+                                   'relax.data_module.OutOfCoreDataModule.from_csv': ( 'data.html#outofcoredatamodule.from_csv',
+                                                                                       'relax/data_module.py'),
+                                   'relax.data_module.OutOfCoreDataModule.iter_chunks': ( 'data.html#outofcoredatamodule.iter_chunks',
+                                                                                          'relax/data_module.py'),
+                                   'relax.data_module.OutOfCoreDataModule.load_from_path': ( 'data.html#outofcoredatamodule.load_from_path',
+                                                                                             'relax/data_module.py'),
                                    'relax.data_module.TabularDataModule': ('data.html#tabulardatamodule', 'relax/data_module.py'),
                                    'relax.data_module.TabularDataModule.__init__': ( 'data.html#tabulardatamodule.__init__',
                                                                                      'relax/data_module.py'),
@@ -73,6 +105,27 @@ d = { 'settings': { 'branch': 'master',
                                                                                    'relax/data_module.py'),
                                    'relax.data_module.TabularDataModuleConfigs.__ini__': ( 'data.html#tabulardatamoduleconfigs.__ini__',
                                                                                            'relax/data_module.py'),
+                                   'relax.data_module._FeaturesSnapshotWriter': ( 'data.html#_featuressnapshotwriter',
+                                                                                  'relax/data_module.py'),
+                                   'relax.data_module._FeaturesSnapshotWriter.__init__': ( 'data.html#_featuressnapshotwriter.__init__',
+                                                                                           'relax/data_module.py'),
+                                   'relax.data_module._FeaturesSnapshotWriter.close': ( 'data.html#_featuressnapshotwriter.close',
+                                                                                        'relax/data_module.py'),
+                                   'relax.data_module._FeaturesSnapshotWriter.write': ( 'data.html#_featuressnapshotwriter.write',
+                                                                                        'relax/data_module.py'),
+                                   'relax.data_module._column_dtype': ('data.html#_column_dtype', 'relax/data_module.py'),
+                                   'relax.data_module._csv_columns': ('data.html#_csv_columns', 'relax/data_module.py'),
+                                   'relax.data_module._index_dtype': ('data.html#_index_dtype', 'relax/data_module.py'),
+                                   'relax.data_module._load_array': ('data.html#_load_array', 'relax/data_module.py'),
+                                   'relax.data_module._load_features_snapshot': ( 'data.html#_load_features_snapshot',
+                                                                                  'relax/data_module.py'),
+                                   'relax.data_module._pad_to_tiles': ('data.html#_pad_to_tiles', 'relax/data_module.py'),
+                                   'relax.data_module._remove_stale_artifacts': ( 'data.html#_remove_stale_artifacts',
+                                                                                  'relax/data_module.py'),
+                                   'relax.data_module._save_array': ('data.html#_save_array', 'relax/data_module.py'),
+                                   'relax.data_module._save_features_snapshot': ( 'data.html#_save_features_snapshot',
+                                                                                  'relax/data_module.py'),
+                                   'relax.data_module._save_npy': ('data.html#_save_npy', 'relax/data_module.py'),
                                    'relax.data_module._validate_dataname': ('data.html#_validate_dataname', 'relax/data_module.py'),
                                    'relax.data_module.dataframe2features': ('data.html#dataframe2features', 'relax/data_module.py'),
                                    'relax.data_module.dataframe2labels': ('data.html#dataframe2labels', 'relax/data_module.py'),
@@ -81,6 +134,7 @@ d = { 'settings': { 'branch': 'master',
                                                                                      'relax/data_module.py'),
                                    'relax.data_module.features2config': ('data.html#features2config', 'relax/data_module.py'),
                                    'relax.data_module.features2pandas': ('data.html#features2pandas', 'relax/data_module.py'),
+                                   'relax.data_module.l2_knn': ('data.html#l2_knn', 'relax/data_module.py'),
                                    'relax.data_module.load_data': ('data.html#load_data', 'relax/data_module.py'),
                                    'relax.data_module.to_feature': ('data.html#to_feature', 'relax/data_module.py')},
             'relax.data_utils': { 'relax.data_utils.DataPreprocessor': ('data.utils.html#datapreprocessor', 'relax/data_utils.py'),
@@ -93,6 +147,8 @@ d = { 'settings': { 'branch': 'master',
                                                                                    'relax/data_utils.py'),
                                   'relax.data_utils.DataPreprocessor.inverse_transform': ( 'data.utils.html#datapreprocessor.inverse_transform',
                                                                                            'relax/data_utils.py'),
+                                  'relax.data_utils.DataPreprocessor.partial_fit': ( 'data.utils.html#datapreprocessor.partial_fit',
+                                                                                     'relax/data_utils.py'),
                                   'relax.data_utils.DataPreprocessor.to_dict': ( 'data.utils.html#datapreprocessor.to_dict',
                                                                                  'relax/data_utils.py'),
                                   'relax.data_utils.DataPreprocessor.transform': ( 'data.utils.html#datapreprocessor.transform',
@@ -102,6 +158,8 @@ d = { 'settings': { 'branch': 'master',
                                                                                  'relax/data_utils.py'),
                                   'relax.data_utils.EncoderPreprocessor._inverse_transform': ( 'data.utils.html#encoderpreprocessor._inverse_transform',
                                                                                                'relax/data_utils.py'),
+                                  'relax.data_utils.EncoderPreprocessor._partial_fit': ( 'data.utils.html#encoderpreprocessor._partial_fit',
+                                                                                         'relax/data_utils.py'),
                                   'relax.data_utils.EncoderPreprocessor._transform': ( 'data.utils.html#encoderpreprocessor._transform',
                                                                                        'relax/data_utils.py'),
                                   'relax.data_utils.EncoderPreprocessor.from_dict': ( 'data.utils.html#encoderpreprocessor.from_dict',
@@ -150,6 +208,8 @@ d = { 'settings': { 'branch': 'master',
                                   'relax.data_utils.FeaturesList.__len__': ('data.utils.html#featureslist.__len__', 'relax/data_utils.py'),
                                   'relax.data_utils.FeaturesList.__next__': ( 'data.utils.html#featureslist.__next__',
                                                                               'relax/data_utils.py'),
+                                  'relax.data_utils.FeaturesList._get_constraints_kernel': ( 'data.utils.html#featureslist._get_constraints_kernel',
+                                                                                             'relax/data_utils.py'),
                                   'relax.data_utils.FeaturesList._transform_data': ( 'data.utils.html#featureslist._transform_data',
                                                                                      'relax/data_utils.py'),
                                   'relax.data_utils.FeaturesList.apply_constraints': ( 'data.utils.html#featureslist.apply_constraints',
@@ -194,6 +254,8 @@ d = { 'settings': { 'branch': 'master',
                                                                                              'relax/data_utils.py'),
                                   'relax.data_utils.IdentityTransformation.from_dict': ( 'data.utils.html#identitytransformation.from_dict',
                                                                                          'relax/data_utils.py'),
+                                  'relax.data_utils.IdentityTransformation.partial_fit': ( 'data.utils.html#identitytransformation.partial_fit',
+                                                                                           'relax/data_utils.py'),
                                   'relax.data_utils.IdentityTransformation.to_dict': ( 'data.utils.html#identitytransformation.to_dict',
                                                                                        'relax/data_utils.py'),
                                   'relax.data_utils.IdentityTransformation.transform': ( 'data.utils.html#identitytransformation.transform',
@@ -206,6 +268,8 @@ d = { 'settings': { 'branch': 'master',
                                                                                'relax/data_utils.py'),
                                   'relax.data_utils.MinMaxScaler.inverse_transform': ( 'data.utils.html#minmaxscaler.inverse_transform',
                                                                                        'relax/data_utils.py'),
+                                  'relax.data_utils.MinMaxScaler.partial_fit': ( 'data.utils.html#minmaxscaler.partial_fit',
+                                                                                 'relax/data_utils.py'),
                                   'relax.data_utils.MinMaxScaler.to_dict': ('data.utils.html#minmaxscaler.to_dict', 'relax/data_utils.py'),
                                   'relax.data_utils.MinMaxScaler.transform': ( 'data.utils.html#minmaxscaler.transform',
                                                                                'relax/data_utils.py'),
@@ -218,6 +282,8 @@ d = { 'settings': { 'branch': 'master',
                                   'relax.data_utils.OneHotEncoder.fit': ('data.utils.html#onehotencoder.fit', 'relax/data_utils.py'),
                                   'relax.data_utils.OneHotEncoder.inverse_transform': ( 'data.utils.html#onehotencoder.inverse_transform',
                                                                                         'relax/data_utils.py'),
+                                  'relax.data_utils.OneHotEncoder.partial_fit': ( 'data.utils.html#onehotencoder.partial_fit',
+                                                                                  'relax/data_utils.py'),
                                   'relax.data_utils.OneHotEncoder.transform': ( 'data.utils.html#onehotencoder.transform',
                                                                                 'relax/data_utils.py'),
                                   'relax.data_utils.OneHotTransformation': ('data.utils.html#onehottransformation', 'relax/data_utils.py'),
@@ -234,6 +300,8 @@ d = { 'settings': { 'branch': 'master',
                                                                                 'relax/data_utils.py'),
                                   'relax.data_utils.OrdinalPreprocessor.inverse_transform': ( 'data.utils.html#ordinalpreprocessor.inverse_transform',
                                                                                               'relax/data_utils.py'),
+                                  'relax.data_utils.OrdinalPreprocessor.partial_fit': ( 'data.utils.html#ordinalpreprocessor.partial_fit',
+                                                                                        'relax/data_utils.py'),
                                   'relax.data_utils.OrdinalPreprocessor.transform': ( 'data.utils.html#ordinalpreprocessor.transform',
                                                                                       'relax/data_utils.py'),
                                   'relax.data_utils.OrdinalTransformation': ( 'data.utils.html#ordinaltransformation',
@@ -258,12 +326,30 @@ d = { 'settings': { 'branch': 'master',
                                                                                          'relax/data_utils.py'),
                                   'relax.data_utils.Transformation.is_categorical': ( 'data.utils.html#transformation.is_categorical',
                                                                                       'relax/data_utils.py'),
+                                  'relax.data_utils.Transformation.partial_fit': ( 'data.utils.html#transformation.partial_fit',
+                                                                                   'relax/data_utils.py'),
                                   'relax.data_utils.Transformation.to_dict': ( 'data.utils.html#transformation.to_dict',
                                                                                'relax/data_utils.py'),
                                   'relax.data_utils.Transformation.transform': ( 'data.utils.html#transformation.transform',
                                                                                  'relax/data_utils.py'),
+                                  'relax.data_utils._ConstraintsKernel': ('data.utils.html#_constraintskernel', 'relax/data_utils.py'),
+                                  'relax.data_utils._ConstraintsKernel.__call__': ( 'data.utils.html#_constraintskernel.__call__',
+                                                                                    'relax/data_utils.py'),
+                                  'relax.data_utils._ConstraintsKernel.__init__': ( 'data.utils.html#_constraintskernel.__init__',
+                                                                                    'relax/data_utils.py'),
+                                  'relax.data_utils._ConstraintsKernel._apply_constraints': ( 'data.utils.html#_constraintskernel._apply_constraints',
+                                                                                              'relax/data_utils.py'),
+                                  'relax.data_utils._ConstraintsKernel._compute_reg_loss': ( 'data.utils.html#_constraintskernel._compute_reg_loss',
+                                                                                             'relax/data_utils.py'),
+                                  'relax.data_utils._ConstraintsKernel._segment_softmax': ( 'data.utils.html#_constraintskernel._segment_softmax',
+                                                                                            'relax/data_utils.py'),
+                                  'relax.data_utils._ConstraintsKernel.compute_reg_loss': ( 'data.utils.html#_constraintskernel.compute_reg_loss',
+                                                                                            'relax/data_utils.py'),
+                                  'relax.data_utils._ConstraintsKernel.is_supported': ( 'data.utils.html#_constraintskernel.is_supported',
+                                                                                        'relax/data_utils.py'),
                                   'relax.data_utils._check_xs': ('data.utils.html#_check_xs', 'relax/data_utils.py'),
-                                  'relax.data_utils._unique': ('data.utils.html#_unique', 'relax/data_utils.py')},
+                                  'relax.data_utils._unique': ('data.utils.html#_unique', 'relax/data_utils.py'),
+                                  'relax.data_utils.feature_segment_ids': ('data.utils.html#feature_segment_ids', 'relax/data_utils.py')},
             'relax.docs': { 'relax.docs.CustomizedMarkdownRenderer': ('docs.html#customizedmarkdownrenderer', 'relax/docs.py'),
                             'relax.docs.CustomizedMarkdownRenderer.__init__': ( 'docs.html#customizedmarkdownrenderer.__init__',
                                                                                 'relax/docs.py'),
@@ -292,28 +378,57 @@ d = { 'settings': { 'branch': 'master',
                                 'relax.evaluate.BaseEvalMetrics.__call__': ('evaluate.html#baseevalmetrics.__call__', 'relax/evaluate.py'),
                                 'relax.evaluate.BaseEvalMetrics.__init__': ('evaluate.html#baseevalmetrics.__init__', 'relax/evaluate.py'),
                                 'relax.evaluate.BaseEvalMetrics.__str__': ('evaluate.html#baseevalmetrics.__str__', 'relax/evaluate.py'),
+                                'relax.evaluate.BaseEvalMetrics.per_instance': ( 'evaluate.html#baseevalmetrics.per_instance',
+                                                                                 'relax/evaluate.py'),
                                 'relax.evaluate.ManifoldDist': ('evaluate.html#manifolddist', 'relax/evaluate.py'),
                                 'relax.evaluate.ManifoldDist.__call__': ('evaluate.html#manifolddist.__call__', 'relax/evaluate.py'),
                                 'relax.evaluate.ManifoldDist.__init__': ('evaluate.html#manifolddist.__init__', 'relax/evaluate.py'),
+                                'relax.evaluate.ManifoldDist.per_instance': ( 'evaluate.html#manifolddist.per_instance',
+                                                                              'relax/evaluate.py'),
+                                'relax.evaluate.MetricAccumulator': ('evaluate.html#metricaccumulator', 'relax/evaluate.py'),
+                                'relax.evaluate.MetricAccumulator.__init__': ( 'evaluate.html#metricaccumulator.__init__',
+                                                                               'relax/evaluate.py'),
+                                'relax.evaluate.MetricAccumulator._add_to_sketch': ( 'evaluate.html#metricaccumulator._add_to_sketch',
+                                                                                     'relax/evaluate.py'),
+                                'relax.evaluate.MetricAccumulator.mean': ('evaluate.html#metricaccumulator.mean', 'relax/evaluate.py'),
+                                'relax.evaluate.MetricAccumulator.merge': ('evaluate.html#metricaccumulator.merge', 'relax/evaluate.py'),
+                                'relax.evaluate.MetricAccumulator.quantile': ( 'evaluate.html#metricaccumulator.quantile',
+                                                                               'relax/evaluate.py'),
+                                'relax.evaluate.MetricAccumulator.std': ('evaluate.html#metricaccumulator.std', 'relax/evaluate.py'),
+                                'relax.evaluate.MetricAccumulator.update': ('evaluate.html#metricaccumulator.update', 'relax/evaluate.py'),
                                 'relax.evaluate.PredictiveAccuracy': ('evaluate.html#predictiveaccuracy', 'relax/evaluate.py'),
                                 'relax.evaluate.PredictiveAccuracy.__call__': ( 'evaluate.html#predictiveaccuracy.__call__',
                                                                                 'relax/evaluate.py'),
                                 'relax.evaluate.PredictiveAccuracy.__init__': ( 'evaluate.html#predictiveaccuracy.__init__',
                                                                                 'relax/evaluate.py'),
+                                'relax.evaluate.PredictiveAccuracy.per_instance': ( 'evaluate.html#predictiveaccuracy.per_instance',
+                                                                                    'relax/evaluate.py'),
                                 'relax.evaluate.Proximity': ('evaluate.html#proximity', 'relax/evaluate.py'),
                                 'relax.evaluate.Proximity.__call__': ('evaluate.html#proximity.__call__', 'relax/evaluate.py'),
                                 'relax.evaluate.Proximity.__init__': ('evaluate.html#proximity.__init__', 'relax/evaluate.py'),
+                                'relax.evaluate.Proximity.per_instance': ('evaluate.html#proximity.per_instance', 'relax/evaluate.py'),
                                 'relax.evaluate.Runtime': ('evaluate.html#runtime', 'relax/evaluate.py'),
                                 'relax.evaluate.Runtime.__call__': ('evaluate.html#runtime.__call__', 'relax/evaluate.py'),
                                 'relax.evaluate.Runtime.__init__': ('evaluate.html#runtime.__init__', 'relax/evaluate.py'),
                                 'relax.evaluate.Sparsity': ('evaluate.html#sparsity', 'relax/evaluate.py'),
                                 'relax.evaluate.Sparsity.__call__': ('evaluate.html#sparsity.__call__', 'relax/evaluate.py'),
                                 'relax.evaluate.Sparsity.__init__': ('evaluate.html#sparsity.__init__', 'relax/evaluate.py'),
+                                'relax.evaluate.Sparsity.per_instance': ('evaluate.html#sparsity.per_instance', 'relax/evaluate.py'),
                                 'relax.evaluate.Validity': ('evaluate.html#validity', 'relax/evaluate.py'),
                                 'relax.evaluate.Validity.__call__': ('evaluate.html#validity.__call__', 'relax/evaluate.py'),
                                 'relax.evaluate.Validity.__init__': ('evaluate.html#validity.__init__', 'relax/evaluate.py'),
+                                'relax.evaluate.Validity.per_instance': ('evaluate.html#validity.per_instance', 'relax/evaluate.py'),
+                                'relax.evaluate._evaluate_fused': ('evaluate.html#_evaluate_fused', 'relax/evaluate.py'),
+                                'relax.evaluate._evaluate_group': ('evaluate.html#_evaluate_group', 'relax/evaluate.py'),
+                                'relax.evaluate._fused_metric_stats': ('evaluate.html#_fused_metric_stats', 'relax/evaluate.py'),
+                                'relax.evaluate._fused_spec': ('evaluate.html#_fused_spec', 'relax/evaluate.py'),
                                 'relax.evaluate._get_metric': ('evaluate.html#_get_metric', 'relax/evaluate.py'),
+                                'relax.evaluate._group_key': ('evaluate.html#_group_key', 'relax/evaluate.py'),
+                                'relax.evaluate._pad_chunk': ('evaluate.html#_pad_chunk', 'relax/evaluate.py'),
+                                'relax.evaluate._resolve_metric': ('evaluate.html#_resolve_metric', 'relax/evaluate.py'),
+                                'relax.evaluate.accumulate_cfs': ('evaluate.html#accumulate_cfs', 'relax/evaluate.py'),
                                 'relax.evaluate.benchmark_cfs': ('evaluate.html#benchmark_cfs', 'relax/evaluate.py'),
+                                'relax.evaluate.compute_feature_changes': ('evaluate.html#compute_feature_changes', 'relax/evaluate.py'),
                                 'relax.evaluate.compute_proximity': ('evaluate.html#compute_proximity', 'relax/evaluate.py'),
                                 'relax.evaluate.compute_single_proximity': ('evaluate.html#compute_single_proximity', 'relax/evaluate.py'),
                                 'relax.evaluate.compute_single_sparsity': ('evaluate.html#compute_single_sparsity', 'relax/evaluate.py'),
@@ -323,7 +438,16 @@ d = { 'settings': { 'branch': 'master',
                                 'relax.evaluate.evaluate_cfs': ('evaluate.html#evaluate_cfs', 'relax/evaluate.py'),
                                 'relax.evaluate.l2_ann': ('evaluate.html#l2_ann', 'relax/evaluate.py'),
                                 'relax.evaluate.pairwise_distances': ('evaluate.html#pairwise_distances', 'relax/evaluate.py')},
-            'relax.explain': { 'relax.explain.Explanation': ('explain.html#explanation', 'relax/explain.py'),
+            'relax.explain': { 'relax.explain.CFCache': ('explain.html#cfcache', 'relax/explain.py'),
+                               'relax.explain.CFCache.__init__': ('explain.html#cfcache.__init__', 'relax/explain.py'),
+                               'relax.explain.CFCache.__len__': ('explain.html#cfcache.__len__', 'relax/explain.py'),
+                               'relax.explain.CFCache._evict': ('explain.html#cfcache._evict', 'relax/explain.py'),
+                               'relax.explain.CFCache.clear': ('explain.html#cfcache.clear', 'relax/explain.py'),
+                               'relax.explain.CFCache.close': ('explain.html#cfcache.close', 'relax/explain.py'),
+                               'relax.explain.CFCache.get_many': ('explain.html#cfcache.get_many', 'relax/explain.py'),
+                               'relax.explain.CFCache.put_many': ('explain.html#cfcache.put_many', 'relax/explain.py'),
+                               'relax.explain.CFCache.size': ('explain.html#cfcache.size', 'relax/explain.py'),
+                               'relax.explain.Explanation': ('explain.html#explanation', 'relax/explain.py'),
                                'relax.explain.Explanation.__getitem__': ('explain.html#explanation.__getitem__', 'relax/explain.py'),
                                'relax.explain.Explanation.__init__': ('explain.html#explanation.__init__', 'relax/explain.py'),
                                'relax.explain.Explanation.__repr__': ('explain.html#explanation.__repr__', 'relax/explain.py'),
@@ -334,9 +458,14 @@ d = { 'settings': { 'branch': 'master',
                                'relax.explain.Explanation.features_and_indices': ( 'explain.html#explanation.features_and_indices',
                                                                                    'relax/explain.py'),
                                'relax.explain.Explanation.load_from_path': ('explain.html#explanation.load_from_path', 'relax/explain.py'),
+                               'relax.explain.Explanation.neighbor_index': ('explain.html#explanation.neighbor_index', 'relax/explain.py'),
                                'relax.explain.Explanation.save': ('explain.html#explanation.save', 'relax/explain.py'),
+                               'relax.explain._cached_generation': ('explain.html#_cached_generation', 'relax/explain.py'),
+                               'relax.explain._generate_out_of_core': ('explain.html#_generate_out_of_core', 'relax/explain.py'),
+                               'relax.explain._unique_rows': ('explain.html#_unique_rows', 'relax/explain.py'),
                                'relax.explain.fake_explanation': ('explain.html#fake_explanation', 'relax/explain.py'),
                                'relax.explain.generate_cf_explanations': ('explain.html#generate_cf_explanations', 'relax/explain.py'),
+                               'relax.explain.iter_cf_explanations': ('explain.html#iter_cf_explanations', 'relax/explain.py'),
                                'relax.explain.prepare_cf_module': ('explain.html#prepare_cf_module', 'relax/explain.py'),
                                'relax.explain.prepare_pred_fn': ('explain.html#prepare_pred_fn', 'relax/explain.py'),
                                'relax.explain.prepare_rng_keys': ('explain.html#prepare_rng_keys', 'relax/explain.py')},
@@ -454,12 +583,17 @@ d = { 'settings': { 'branch': 'master',
             'relax.methods.base': { 'relax.methods.base.CFModule': ('methods/base.html#cfmodule', 'relax/methods/base.py'),
                                     'relax.methods.base.CFModule.__init__': ( 'methods/base.html#cfmodule.__init__',
                                                                               'relax/methods/base.py'),
+                                    'relax.methods.base.CFModule._compile_cache_key': ( 'methods/base.html#cfmodule._compile_cache_key',
+                                                                                        'relax/methods/base.py'),
                                     'relax.methods.base.CFModule.apply_constraints': ( 'methods/base.html#cfmodule.apply_constraints',
                                                                                        'relax/methods/base.py'),
                                     'relax.methods.base.CFModule.before_generate_cf': ( 'methods/base.html#cfmodule.before_generate_cf',
                                                                                         'relax/methods/base.py'),
+                                    'relax.methods.base.CFModule.compile': ('methods/base.html#cfmodule.compile', 'relax/methods/base.py'),
                                     'relax.methods.base.CFModule.compute_reg_loss': ( 'methods/base.html#cfmodule.compute_reg_loss',
                                                                                       'relax/methods/base.py'),
+                                    'relax.methods.base.CFModule.fingerprint': ( 'methods/base.html#cfmodule.fingerprint',
+                                                                                 'relax/methods/base.py'),
                                     'relax.methods.base.CFModule.generate_cf': ( 'methods/base.html#cfmodule.generate_cf',
                                                                                  'relax/methods/base.py'),
                                     'relax.methods.base.CFModule.set_apply_constraints_fn': ( 'methods/base.html#cfmodule.set_apply_constraints_fn',
@@ -472,6 +606,7 @@ d = { 'settings': { 'branch': 'master',
                                                                                'relax/methods/base.py'),
                                     'relax.methods.base.ParametricCFModule.train': ( 'methods/base.html#parametriccfmodule.train',
                                                                                      'relax/methods/base.py'),
+                                    'relax.methods.base._strategy_state': ('methods/base.html#_strategy_state', 'relax/methods/base.py'),
                                     'relax.methods.base.default_apply_constraints_fn': ( 'methods/base.html#default_apply_constraints_fn',
                                                                                          'relax/methods/base.py'),
                                     'relax.methods.base.default_compute_reg_loss_fn': ( 'methods/base.html#default_compute_reg_loss_fn',
@@ -723,16 +858,26 @@ d = { 'settings': { 'branch': 'master',
             'relax.methods.vanilla': { 'relax.methods.vanilla.VanillaCF': ('methods/vanilla.html#vanillacf', 'relax/methods/vanilla.py'),
                                        'relax.methods.vanilla.VanillaCF.__init__': ( 'methods/vanilla.html#vanillacf.__init__',
                                                                                      'relax/methods/vanilla.py'),
+                                       'relax.methods.vanilla.VanillaCF.cf_from_state': ( 'methods/vanilla.html#vanillacf.cf_from_state',
+                                                                                          'relax/methods/vanilla.py'),
                                        'relax.methods.vanilla.VanillaCF.generate_cf': ( 'methods/vanilla.html#vanillacf.generate_cf',
                                                                                         'relax/methods/vanilla.py'),
+                                       'relax.methods.vanilla.VanillaCF.init_cf_state': ( 'methods/vanilla.html#vanillacf.init_cf_state',
+                                                                                          'relax/methods/vanilla.py'),
                                        'relax.methods.vanilla.VanillaCF.load_from_path': ( 'methods/vanilla.html#vanillacf.load_from_path',
                                                                                            'relax/methods/vanilla.py'),
                                        'relax.methods.vanilla.VanillaCF.save': ( 'methods/vanilla.html#vanillacf.save',
                                                                                  'relax/methods/vanilla.py'),
+                                       'relax.methods.vanilla.VanillaCF.update_cf_state': ( 'methods/vanilla.html#vanillacf.update_cf_state',
+                                                                                            'relax/methods/vanilla.py'),
                                        'relax.methods.vanilla.VanillaCFConfig': ( 'methods/vanilla.html#vanillacfconfig',
                                                                                   'relax/methods/vanilla.py'),
                                        'relax.methods.vanilla._vanilla_cf': ( 'methods/vanilla.html#_vanilla_cf',
-                                                                              'relax/methods/vanilla.py')},
+                                                                              'relax/methods/vanilla.py'),
+                                       'relax.methods.vanilla._vanilla_cf_step': ( 'methods/vanilla.html#_vanilla_cf_step',
+                                                                                   'relax/methods/vanilla.py'),
+                                       'relax.methods.vanilla._vanilla_cf_steps': ( 'methods/vanilla.html#_vanilla_cf_steps',
+                                                                                    'relax/methods/vanilla.py')},
             'relax.ml_model': { 'relax.ml_model.AutoEncoder': ('ml_model.html#autoencoder', 'relax/ml_model.py'),
                                 'relax.ml_model.AutoEncoder.__init__': ('ml_model.html#autoencoder.__init__', 'relax/ml_model.py'),
                                 'relax.ml_model.AutoEncoder.call': ('ml_model.html#autoencoder.call', 'relax/ml_model.py'),
@@ -753,9 +898,39 @@ d = { 'settings': { 'branch': 'master',
                                 'relax.ml_model.MLPBlock.__init__': ('ml_model.html#mlpblock.__init__', 'relax/ml_model.py'),
                                 'relax.ml_model.MLPBlock.build': ('ml_model.html#mlpblock.build', 'relax/ml_model.py'),
                                 'relax.ml_model.MLPBlock.call': ('ml_model.html#mlpblock.call', 'relax/ml_model.py'),
+                                'relax.ml_model._OutOfCoreDataset': ('ml_model.html#_outofcoredataset', 'relax/ml_model.py'),
+                                'relax.ml_model._OutOfCoreDataset.__getitem__': ( 'ml_model.html#_outofcoredataset.__getitem__',
+                                                                                  'relax/ml_model.py'),
+                                'relax.ml_model._OutOfCoreDataset.__init__': ( 'ml_model.html#_outofcoredataset.__init__',
+                                                                               'relax/ml_model.py'),
+                                'relax.ml_model._OutOfCoreDataset.__len__': ( 'ml_model.html#_outofcoredataset.__len__',
+                                                                              'relax/ml_model.py'),
+                                'relax.ml_model._OutOfCoreDataset.on_epoch_end': ( 'ml_model.html#_outofcoredataset.on_epoch_end',
+                                                                                   'relax/ml_model.py'),
                                 'relax.ml_model.download_ml_module': ('ml_model.html#download_ml_module', 'relax/ml_model.py'),
                                 'relax.ml_model.load_ml_module': ('ml_model.html#load_ml_module', 'relax/ml_model.py')},
-            'relax.strategy': { 'relax.strategy.BaseStrategy': ('explain.strategy.html#basestrategy', 'relax/strategy.py'),
+            'relax.serve': { 'relax.serve.ExplanationServer': ('explain.serve.html#explanationserver', 'relax/serve.py'),
+                             'relax.serve.ExplanationServer.__aenter__': ( 'explain.serve.html#explanationserver.__aenter__',
+                                                                           'relax/serve.py'),
+                             'relax.serve.ExplanationServer.__aexit__': ( 'explain.serve.html#explanationserver.__aexit__',
+                                                                          'relax/serve.py'),
+                             'relax.serve.ExplanationServer.__init__': ('explain.serve.html#explanationserver.__init__', 'relax/serve.py'),
+                             'relax.serve.ExplanationServer._generate': ( 'explain.serve.html#explanationserver._generate',
+                                                                          'relax/serve.py'),
+                             'relax.serve.ExplanationServer._next_batch': ( 'explain.serve.html#explanationserver._next_batch',
+                                                                            'relax/serve.py'),
+                             'relax.serve.ExplanationServer._serve': ('explain.serve.html#explanationserver._serve', 'relax/serve.py'),
+                             'relax.serve.ExplanationServer.explain': ('explain.serve.html#explanationserver.explain', 'relax/serve.py'),
+                             'relax.serve.ExplanationServer.metrics': ('explain.serve.html#explanationserver.metrics', 'relax/serve.py'),
+                             'relax.serve.ExplanationServer.start': ('explain.serve.html#explanationserver.start', 'relax/serve.py'),
+                             'relax.serve.ExplanationServer.stop': ('explain.serve.html#explanationserver.stop', 'relax/serve.py')},
+            'relax.strategy': { 'relax.strategy.AutoStrategy': ('explain.strategy.html#autostrategy', 'relax/strategy.py'),
+                                'relax.strategy.AutoStrategy.__call__': ( 'explain.strategy.html#autostrategy.__call__',
+                                                                          'relax/strategy.py'),
+                                'relax.strategy.AutoStrategy.__init__': ( 'explain.strategy.html#autostrategy.__init__',
+                                                                          'relax/strategy.py'),
+                                'relax.strategy.AutoStrategy.plan': ('explain.strategy.html#autostrategy.plan', 'relax/strategy.py'),
+                                'relax.strategy.BaseStrategy': ('explain.strategy.html#basestrategy', 'relax/strategy.py'),
                                 'relax.strategy.BaseStrategy.__call__': ( 'explain.strategy.html#basestrategy.__call__',
                                                                           'relax/strategy.py'),
                                 'relax.strategy.BatchedPmapStrategy': ('explain.strategy.html#batchedpmapstrategy', 'relax/strategy.py'),
@@ -768,14 +943,65 @@ d = { 'settings': { 'branch': 'master',
                                                                                  'relax/strategy.py'),
                                 'relax.strategy.BatchedVmapStrategy.__init__': ( 'explain.strategy.html#batchedvmapstrategy.__init__',
                                                                                  'relax/strategy.py'),
+                                'relax.strategy.BucketedStrategy': ('explain.strategy.html#bucketedstrategy', 'relax/strategy.py'),
+                                'relax.strategy.BucketedStrategy.__call__': ( 'explain.strategy.html#bucketedstrategy.__call__',
+                                                                              'relax/strategy.py'),
+                                'relax.strategy.BucketedStrategy.__init__': ( 'explain.strategy.html#bucketedstrategy.__init__',
+                                                                              'relax/strategy.py'),
+                                'relax.strategy.BucketedStrategy._get_jitted_fn': ( 'explain.strategy.html#bucketedstrategy._get_jitted_fn',
+                                                                                    'relax/strategy.py'),
+                                'relax.strategy.BucketedStrategy.bucket_size': ( 'explain.strategy.html#bucketedstrategy.bucket_size',
+                                                                                 'relax/strategy.py'),
+                                'relax.strategy.EarlyExitStrategy': ('explain.strategy.html#earlyexitstrategy', 'relax/strategy.py'),
+                                'relax.strategy.EarlyExitStrategy.__call__': ( 'explain.strategy.html#earlyexitstrategy.__call__',
+                                                                               'relax/strategy.py'),
+                                'relax.strategy.EarlyExitStrategy.__init__': ( 'explain.strategy.html#earlyexitstrategy.__init__',
+                                                                               'relax/strategy.py'),
+                                'relax.strategy.EarlyExitStrategy._get_jitted_fns': ( 'explain.strategy.html#earlyexitstrategy._get_jitted_fns',
+                                                                                      'relax/strategy.py'),
                                 'relax.strategy.IterativeStrategy': ('explain.strategy.html#iterativestrategy', 'relax/strategy.py'),
                                 'relax.strategy.IterativeStrategy.__call__': ( 'explain.strategy.html#iterativestrategy.__call__',
                                                                                'relax/strategy.py'),
+                                'relax.strategy.PipelinedBatchedStrategy': ( 'explain.strategy.html#pipelinedbatchedstrategy',
+                                                                             'relax/strategy.py'),
+                                'relax.strategy.PipelinedBatchedStrategy.__call__': ( 'explain.strategy.html#pipelinedbatchedstrategy.__call__',
+                                                                                      'relax/strategy.py'),
+                                'relax.strategy.PipelinedBatchedStrategy.__init__': ( 'explain.strategy.html#pipelinedbatchedstrategy.__init__',
+                                                                                      'relax/strategy.py'),
+                                'relax.strategy.PipelinedBatchedStrategy._get_jitted_fn': ( 'explain.strategy.html#pipelinedbatchedstrategy._get_jitted_fn',
+                                                                                            'relax/strategy.py'),
                                 'relax.strategy.PmapStrategy': ('explain.strategy.html#pmapstrategy', 'relax/strategy.py'),
                                 'relax.strategy.PmapStrategy.__call__': ( 'explain.strategy.html#pmapstrategy.__call__',
                                                                           'relax/strategy.py'),
                                 'relax.strategy.PmapStrategy.__init__': ( 'explain.strategy.html#pmapstrategy.__init__',
                                                                           'relax/strategy.py'),
+                                'relax.strategy.ProcessPoolStrategy': ('explain.strategy.html#processpoolstrategy', 'relax/strategy.py'),
+                                'relax.strategy.ProcessPoolStrategy.__call__': ( 'explain.strategy.html#processpoolstrategy.__call__',
+                                                                                 'relax/strategy.py'),
+                                'relax.strategy.ProcessPoolStrategy.__del__': ( 'explain.strategy.html#processpoolstrategy.__del__',
+                                                                                'relax/strategy.py'),
+                                'relax.strategy.ProcessPoolStrategy.__init__': ( 'explain.strategy.html#processpoolstrategy.__init__',
+                                                                                 'relax/strategy.py'),
+                                'relax.strategy.ProcessPoolStrategy._recv': ( 'explain.strategy.html#processpoolstrategy._recv',
+                                                                              'relax/strategy.py'),
+                                'relax.strategy.ProcessPoolStrategy._start_workers': ( 'explain.strategy.html#processpoolstrategy._start_workers',
+                                                                                       'relax/strategy.py'),
+                                'relax.strategy.ProcessPoolStrategy.close': ( 'explain.strategy.html#processpoolstrategy.close',
+                                                                              'relax/strategy.py'),
+                                'relax.strategy.ScanStrategy': ('explain.strategy.html#scanstrategy', 'relax/strategy.py'),
+                                'relax.strategy.ScanStrategy.__call__': ( 'explain.strategy.html#scanstrategy.__call__',
+                                                                          'relax/strategy.py'),
+                                'relax.strategy.ScanStrategy.__init__': ( 'explain.strategy.html#scanstrategy.__init__',
+                                                                          'relax/strategy.py'),
+                                'relax.strategy.ScanStrategy._get_jitted_fn': ( 'explain.strategy.html#scanstrategy._get_jitted_fn',
+                                                                                'relax/strategy.py'),
+                                'relax.strategy.ShardedStrategy': ('explain.strategy.html#shardedstrategy', 'relax/strategy.py'),
+                                'relax.strategy.ShardedStrategy.__call__': ( 'explain.strategy.html#shardedstrategy.__call__',
+                                                                             'relax/strategy.py'),
+                                'relax.strategy.ShardedStrategy.__init__': ( 'explain.strategy.html#shardedstrategy.__init__',
+                                                                             'relax/strategy.py'),
+                                'relax.strategy.ShardedStrategy._get_jitted_fn': ( 'explain.strategy.html#shardedstrategy._get_jitted_fn',
+                                                                                   'relax/strategy.py'),
                                 'relax.strategy.StrategyFactory': ('explain.strategy.html#strategyfactory', 'relax/strategy.py'),
                                 'relax.strategy.StrategyFactory.__init__': ( 'explain.strategy.html#strategyfactory.__init__',
                                                                              'relax/strategy.py'),
@@ -783,16 +1009,50 @@ d = { 'settings': { 'branch': 'master',
                                                                                          'relax/strategy.py'),
                                 'relax.strategy.StrategyFactory.get_strategy': ( 'explain.strategy.html#strategyfactory.get_strategy',
                                                                                  'relax/strategy.py'),
+                                'relax.strategy.StreamingStrategy': ('explain.strategy.html#streamingstrategy', 'relax/strategy.py'),
+                                'relax.strategy.StreamingStrategy.__call__': ( 'explain.strategy.html#streamingstrategy.__call__',
+                                                                               'relax/strategy.py'),
+                                'relax.strategy.StreamingStrategy.__init__': ( 'explain.strategy.html#streamingstrategy.__init__',
+                                                                               'relax/strategy.py'),
+                                'relax.strategy.StreamingStrategy.iter_chunks': ( 'explain.strategy.html#streamingstrategy.iter_chunks',
+                                                                                  'relax/strategy.py'),
                                 'relax.strategy.VmapStrategy': ('explain.strategy.html#vmapstrategy', 'relax/strategy.py'),
                                 'relax.strategy.VmapStrategy.__call__': ( 'explain.strategy.html#vmapstrategy.__call__',
                                                                           'relax/strategy.py'),
+                                'relax.strategy._available_memory_in_bytes': ( 'explain.strategy.html#_available_memory_in_bytes',
+                                                                               'relax/strategy.py'),
                                 'relax.strategy._batched_generation': ('explain.strategy.html#_batched_generation', 'relax/strategy.py'),
+                                'relax.strategy._compiled_flops': ('explain.strategy.html#_compiled_flops', 'relax/strategy.py'),
+                                'relax.strategy._compiled_memory_in_bytes': ( 'explain.strategy.html#_compiled_memory_in_bytes',
+                                                                              'relax/strategy.py'),
+                                'relax.strategy._device_put_batch': ('explain.strategy.html#_device_put_batch', 'relax/strategy.py'),
+                                'relax.strategy._fn_identifier': ('explain.strategy.html#_fn_identifier', 'relax/strategy.py'),
+                                'relax.strategy._jit_cache_key': ('explain.strategy.html#_jit_cache_key', 'relax/strategy.py'),
+                                'relax.strategy._lru_get': ('explain.strategy.html#_lru_get', 'relax/strategy.py'),
+                                'relax.strategy._map_in_buckets': ('explain.strategy.html#_map_in_buckets', 'relax/strategy.py'),
+                                'relax.strategy._next_power_of_2': ('explain.strategy.html#_next_power_of_2', 'relax/strategy.py'),
+                                'relax.strategy._numa_node_cpus': ('explain.strategy.html#_numa_node_cpus', 'relax/strategy.py'),
                                 'relax.strategy._pad_divisible_X': ('explain.strategy.html#_pad_divisible_x', 'relax/strategy.py'),
-                                'relax.strategy._pad_xs': ('explain.strategy.html#_pad_xs', 'relax/strategy.py')},
+                                'relax.strategy._pad_rows_to': ('explain.strategy.html#_pad_rows_to', 'relax/strategy.py'),
+                                'relax.strategy._pad_xs': ('explain.strategy.html#_pad_xs', 'relax/strategy.py'),
+                                'relax.strategy._parse_cpulist': ('explain.strategy.html#_parse_cpulist', 'relax/strategy.py'),
+                                'relax.strategy._process_pool_worker': ('explain.strategy.html#_process_pool_worker', 'relax/strategy.py'),
+                                'relax.strategy._tune_batch_size': ('explain.strategy.html#_tune_batch_size', 'relax/strategy.py')},
             'relax.utils': { 'relax.utils.Config': ('utils.html#config', 'relax/utils.py'),
                              'relax.utils.Config.default': ('utils.html#config.default', 'relax/utils.py'),
+                             'relax.utils._code_names': ('utils.html#_code_names', 'relax/utils.py'),
+                             'relax.utils._concat_states': ('utils.html#_concat_states', 'relax/utils.py'),
+                             'relax.utils._decode_leaf': ('utils.html#_decode_leaf', 'relax/utils.py'),
+                             'relax.utils._encode_leaf': ('utils.html#_encode_leaf', 'relax/utils.py'),
+                             'relax.utils._fn_state': ('utils.html#_fn_state', 'relax/utils.py'),
+                             'relax.utils._fns_fingerprint': ('utils.html#_fns_fingerprint', 'relax/utils.py'),
+                             'relax.utils._globals_state': ('utils.html#_globals_state', 'relax/utils.py'),
+                             'relax.utils._hash_state': ('utils.html#_hash_state', 'relax/utils.py'),
                              'relax.utils._is_array': ('utils.html#_is_array', 'relax/utils.py'),
+                             'relax.utils._load_legacy_pytree': ('utils.html#_load_legacy_pytree', 'relax/utils.py'),
+                             'relax.utils._module_state': ('utils.html#_module_state', 'relax/utils.py'),
                              'relax.utils._reshape_x': ('utils.html#_reshape_x', 'relax/utils.py'),
+                             'relax.utils._value_state': ('utils.html#_value_state', 'relax/utils.py'),
                              'relax.utils.auto_reshaping': ('utils.html#auto_reshaping', 'relax/utils.py'),
                              'relax.utils.get_config': ('utils.html#get_config', 'relax/utils.py'),
                              'relax.utils.grad_update': ('utils.html#grad_update', 'relax/utils.py'),
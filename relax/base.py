@@ -1,7 +1,7 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_base.ipynb.
 
 # %% auto 0
-__all__ = ['BaseConfig', 'BaseModule', 'PredFnMixedin', 'TrainableMixedin']
+__all__ = ['BaseConfig', 'BaseModule', 'PredFnMixedin', 'TrainableMixedin', 'StepwiseMixedin']
 
 # %% ../nbs/00_base.ipynb 2
 from pydantic import BaseModel as BasePydanticModel
@@ -73,3 +73,26 @@ class TrainableMixedin:
         raise NotImplementedError
     
     __ALL__ = ['is_trained', 'train']
+
+# %% ../nbs/00_base.ipynb 10
+class StepwiseMixedin:
+    """Mixin class for modules that can generate counterfactuals step by step."""
+
+    @property
+    def n_steps(self) -> int:
+        """Return the total number of generation steps."""
+        return self.config.n_steps
+    
+    def init_cf_state(self, x, pred_fn, y_target=None, rng_key=None, **kwargs):
+        """Return the initial generation state of a single input `x`."""
+        raise NotImplementedError
+    
+    def update_cf_state(self, state, x, pred_fn, y_target, n_steps, **kwargs):
+        """Run `n_steps` generation steps from `state`, and return the updated state."""
+        raise NotImplementedError
+    
+    def cf_from_state(self, state, x, **kwargs):
+        """Return the counterfactual of `x` from the generation `state`."""
+        raise NotImplementedError
+    
+    __ALL__ = ['n_steps', 'init_cf_state', 'update_cf_state', 'cf_from_state']
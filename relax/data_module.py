@@ -14,13 +14,17 @@ from pathlib import Path
 import json, os, shutil
 from urllib.request import urlretrieve
 from pydantic.fields import ModelField, Field
+from pydantic import validator
 from typing import List, Dict, Union, Optional, Tuple, Callable, Any, Iterable
 import warnings
 from pandas.testing import assert_frame_equal
+from scipy.spatial import cKDTree
+import pickle
 
 # %% auto 0
 __all__ = ['BaseDataModule', 'DataModuleConfig', 'features2config', 'features2pandas', 'dataframe2features', 'dataframe2labels',
-           'DataModule', 'TabularDataModuleConfigs', 'TabularDataModule', 'download_data_module_files', 'load_data']
+           'NearestNeighborIndex', 'DataModule', 'OutOfCoreDataModule', 'TabularDataModuleConfigs', 'TabularDataModule',
+           'download_data_module_files', 'load_data']
 
 # %% ../nbs/01_data.ipynb 6
 class BaseDataModule(BaseModule):
@@ -44,6 +48,9 @@ class DataModuleInfoMixin:
 
     @property
     def data(self) -> pd.DataFrame:
+        if self._data is None:
+            # The dataframe is only built when it is accessed.
+            self._data = features2pandas(self._features, self._label)
         return self._data
     
     @property
@@ -67,15 +74,19 @@ class DataModuleInfoMixin:
         return (self.xs, self.ys)
     
     @property
-    def train_indices(self) -> List[int]:
+    def train_indices(self) -> np.ndarray:
         return self.config.train_indices
     
     @property
-    def test_indices(self) -> List[int]:
+    def test_indices(self) -> np.ndarray:
         return self.config.test_indices
 
-
 # %% ../nbs/01_data.ipynb 10
+def _index_dtype(n: int) -> np.dtype:
+    """The smallest integer dtype that can index `n` rows."""
+    return np.int32 if n <= np.iinfo(np.int32).max else np.int64
+
+# %% ../nbs/01_data.ipynb 11
 class DataModuleConfig(BaseConfig):
     """Configurator of `DataModule`."""
 
@@ -89,8 +100,17 @@ class DataModuleConfig(BaseConfig):
     sample_frac: Optional[float] = Field(
         None, description="Sample fraction of the data. Default to use the entire data.", ge=0., le=1.0
     )
-    train_indices: List[int] = Field([], description="Indices of training data.")
-    test_indices: List[int] = Field([], description="Indices of testing data.")
+    train_indices: np.ndarray = Field([], description="Indices of training data. Lists are converted to integer arrays.")
+    test_indices: np.ndarray = Field([], description="Indices of testing data. Lists are converted to integer arrays.")
+
+    class Config:
+        arbitrary_types_allowed = True
+        json_encoders = {np.ndarray: lambda arr: arr.tolist()}
+
+    @validator('train_indices', 'test_indices', pre=True)
+    def _to_index_array(cls, indices):
+        indices = np.asarray(indices).reshape(-1)
+        return indices.astype(_index_dtype(indices.max(initial=0)))
     
     def shuffle(self, data: Array, test_size: float, seed: int = None):
         """Shuffle data with a seed."""
@@ -99,12 +119,37 @@ class DataModuleConfig(BaseConfig):
         key = jrand.PRNGKey(seed)
         total_length = data.shape[0]
         train_length = int((1 - test_size) * total_length)
+        indices = np.asarray(jrand.permutation(key, total_length)).astype(_index_dtype(total_length))
         if len(self.train_indices) == 0:
-            self.train_indices = jrand.permutation(key, total_length)[:train_length].tolist()
+            self.train_indices = indices[:train_length]
         if len(self.test_indices) == 0:
-            self.test_indices = jrand.permutation(key, total_length)[train_length:].tolist()
-
-# %% ../nbs/01_data.ipynb 13
+            self.test_indices = indices[train_length:]
+
+    def save(self, path):
+        """Save the configs to a json file. The split indices are stored in a `.npz` file next to it."""
+        p = Path(path)
+        if not str(p).endswith('.json'):
+            raise ValueError(f"Path must end with `.json`, but got: {p}")
+        if not p.parent.exists():
+            p.parent.mkdir(parents=True)
+        with open(p, 'w') as f:
+            json.dump(self.dict(exclude={'train_indices', 'test_indices'}), f, indent=4)
+        np.savez(p.with_suffix('.npz'), train_indices=self.train_indices, test_indices=self.test_indices)
+    
+    @classmethod
+    def load_from_json(cls, path):
+        p = Path(path)
+        if not p.exists():
+            raise FileNotFoundError(f"File not found: {p}")
+        with open(p, 'r') as f:
+            configs = json.load(f)
+        # Configs saved by older versions store the split indices in the json file.
+        if p.with_suffix('.npz').exists():
+            with np.load(p.with_suffix('.npz')) as split:
+                configs.update(train_indices=split['train_indices'], test_indices=split['test_indices'])
+        return cls(**configs)
+
+# %% ../nbs/01_data.ipynb 14
 def features2config(
     features: FeaturesList, # FeaturesList to be converted
     name: str, # Name of the data used for `DataModuleConfig`
@@ -136,7 +181,7 @@ def features2config(
     return DataModuleConfig(**configs_dict)
 
 
-# %% ../nbs/01_data.ipynb 15
+# %% ../nbs/01_data.ipynb 16
 def features2pandas(
     features: FeaturesList, # FeaturesList to be converted
     labels: FeaturesList # labels to be converted
@@ -148,7 +193,7 @@ def features2pandas(
     df = pd.concat([feats_df, labels_df], axis=1)
     return df
 
-# %% ../nbs/01_data.ipynb 18
+# %% ../nbs/01_data.ipynb 19
 def to_feature(col: str, data: pd.DataFrame, config: DataModuleConfig, transformation: str):
     return Feature(
         name=col, data=data[col].to_numpy().reshape(-1, 1),
@@ -156,7 +201,7 @@ def to_feature(col: str, data: pd.DataFrame, config: DataModuleConfig, transform
         is_immutable=col in config.imutable_cols
     )
 
-# %% ../nbs/01_data.ipynb 19
+# %% ../nbs/01_data.ipynb 20
 def dataframe2features(
     data: pd.DataFrame,
     config: DataModuleConfig,
@@ -179,7 +224,190 @@ def dataframe2labels(
     labels = [to_feature(col, data, config, 'identity') for col in label_cols]
     return FeaturesList(labels)
 
-# %% ../nbs/01_data.ipynb 21
+# %% ../nbs/01_data.ipynb 22
+def _pad_to_tiles(x: Array, tile_size: int) -> Array: # (n_tiles, tile_size, d)
+    n_tiles = -(-x.shape[0] // tile_size)
+    x = jnp.pad(x, [(0, n_tiles * tile_size - x.shape[0]), (0, 0)])
+    return x.reshape(n_tiles, tile_size, x.shape[-1])
+
+@ft.partial(jax.jit, static_argnames=["k", "tile_size"])
+def l2_knn(
+    qy: Array, # (n, d) Query vectors
+    db: Array, # (m, d) Database
+    k: int = 10, # Number of nearest neighbors to return
+    tile_size: int = 1024 # Number of queries (and database vectors) compared at a time
+) -> Tuple[Array, Array]: # Return (distance, neighbor_indices) tuples
+    """Exact k-nearest neighbors in L2 distance. Queries and database are processed in tiles 
+    with a running top-k per query, so that the memory usage is O(tile_size^2) instead of O(n * m)."""
+    n, m = qy.shape[0], db.shape[0]
+    if k > m:
+        raise ValueError(f"k={k} is larger than the size of the database ({m}).")
+    qy, db = jnp.asarray(qy, dtype=float), jnp.asarray(db, dtype=float)
+    db_size = min(tile_size, m)
+    db_tiles = _pad_to_tiles(db, db_size)
+    n_db_tiles = db_tiles.shape[0]
+    db_sq = (db_tiles ** 2).sum(axis=-1)
+    db_indices = jnp.arange(n_db_tiles * db_size).reshape(n_db_tiles, db_size)
+
+    def search_tile(q: Array): # (q_size, d)
+        q_sq = (q ** 2).sum(axis=-1, keepdims=True)
+
+        def merge_tile(carry, tile):
+            best_dists, best_indices = carry
+            x, x_sq, indices = tile
+            # Squared L2 distance via matmul; padded database vectors are never selected.
+            dists = jnp.where(indices < m, q_sq - 2 * q @ x.T + x_sq, jnp.inf)
+            dists = jnp.concatenate([best_dists, dists], axis=1)
+            indices = jnp.concatenate([best_indices, jnp.broadcast_to(indices, (q.shape[0], db_size))], axis=1)
+            neg_dists, pos = lax.top_k(-dists, k)
+            return (-neg_dists, jnp.take_along_axis(indices, pos, axis=1)), None
+
+        init = (jnp.full((q.shape[0], k), jnp.inf, dtype=q.dtype), jnp.zeros((q.shape[0], k), dtype=db_indices.dtype))
+        (dists, indices), _ = lax.scan(merge_tile, init, (db_tiles, db_sq, db_indices))
+        return dists, indices
+
+    dists, indices = lax.map(search_tile, _pad_to_tiles(qy, min(tile_size, n)))
+    dists, indices = dists.reshape(-1, k)[:n], indices.reshape(-1, k)[:n]
+    return jnp.sqrt(jnp.clip(dists, a_min=0.)), indices
+
+# %% ../nbs/01_data.ipynb 24
+_KD_TREE_MAX_DIM = 16 # KD-tree is no faster than brute force search in higher dimensions
+
+# %% ../nbs/01_data.ipynb 25
+class NearestNeighborIndex:
+    """Exact L2 nearest neighbor index of `xs`."""
+
+    def __init__(
+        self,
+        xs: Array, # (n, d) Data to be indexed
+        algorithm: Literal['auto', 'kd_tree', 'brute'] = 'auto', # `auto` uses `kd_tree` for low-dimensional data, and `brute` otherwise
+        leafsize: int = 16, # Leaf size of the KD-tree
+    ):
+        if algorithm == 'auto':
+            algorithm = 'kd_tree' if xs.shape[1] <= _KD_TREE_MAX_DIM else 'brute'
+        if algorithm == 'kd_tree':
+            self._tree = cKDTree(np.asarray(xs), leafsize=leafsize)
+        elif algorithm == 'brute':
+            self._xs = np.asarray(xs)
+        else:
+            raise ValueError(f"Unknown algorithm: {algorithm}. Should be one of ['auto', 'kd_tree', 'brute']")
+        self.algorithm = algorithm
+        self.size = xs.shape[0]
+
+    def query(
+        self, 
+        qy: Array, # (m, d) Query vectors
+        k: int = 1 # Number of nearest neighbors to return
+    ) -> Tuple[Array, Array]: # Return (distance, neighbor_indices) tuples of shape (m, k)
+        """Search the `k` nearest neighbors of `qy`."""
+        if k > self.size:
+            raise ValueError(f"k={k} is larger than the size of the database ({self.size}).")
+        if self.algorithm == 'kd_tree':
+            dists, indices = self._tree.query(np.asarray(qy), k=np.arange(1, k + 1), workers=-1)
+            return jnp.asarray(dists), jnp.asarray(indices)
+        return l2_knn(qy, self._xs, k=k)
+
+    def save(self, path: str):
+        """Save the index to a file. The data of a `brute` index is not saved; it is rebound when loading."""
+        state = {name: attr for name, attr in vars(self).items() if name != '_xs'}
+        with open(path, "wb") as f:
+            pickle.dump(state, f)
+
+    @classmethod
+    def load_from_path(
+        cls, 
+        path: str, 
+        xs: Array = None, # (n, d) Indexed data. Required by the `brute` index
+    ) -> NearestNeighborIndex:
+        """Load the index from a file."""
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        if index.algorithm == 'brute':
+            if xs is None:
+                raise ValueError("`xs` is required to load a `brute` index.")
+            if xs.shape[0] != index.size:
+                raise ValueError(f"The index was built on {index.size} rows, but got xs.shape={xs.shape}.")
+            index._xs = np.asarray(xs)
+        return index
+
+# %% ../nbs/01_data.ipynb 28
+_SNAPSHOT_FORMAT = "relax.snapshot"
+_SNAPSHOT_VERSION = 1
+
+def _save_npy(path: Path, arr: np.ndarray, allow_pickle: bool = False):
+    """Save `arr` to `path` via a temporary file, so that arrays memory-mapped from the old file stay valid."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.npy.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, arr, allow_pickle=allow_pickle)
+    os.replace(tmp_path, path)
+
+def _save_array(path: Path, arr: np.ndarray) -> bool: # Return whether the saved array can be memory-mapped
+    """Save `arr` as a `.npy` file. Arrays of strings are stored as fixed-width unicode, so that they can be memory-mapped."""
+    arr = np.asarray(arr)
+    if arr.dtype == object and all(isinstance(v, str) for v in arr.ravel()):
+        arr = arr.astype(str)
+    _save_npy(path, arr, allow_pickle=arr.dtype == object)
+    return arr.dtype != object
+
+def _load_array(path: Path, mmap: bool) -> np.ndarray:
+    """Load a `.npy` file, memory-mapped if possible."""
+    if mmap:
+        return np.load(path, mmap_mode='r')
+    return np.load(path, allow_pickle=True)
+
+def _save_features_snapshot(features: FeaturesList, path: Path) -> dict:
+    """Save the transformed data and the columns of `features` under `path`, and return their manifest."""
+    path.mkdir(parents=True, exist_ok=True)
+    _save_npy(path / "transformed_data.npy", np.asarray(features.transformed_data))
+    save_pytree([feat.transformation.to_dict() for feat in features.features], path)
+    columns = []
+    for i, feat in enumerate(features.features):
+        columns.append({
+            "name": feat.name,
+            "file": f"{i}.npy",
+            "mmap": _save_array(path / f"{i}.npy", feat.data),
+            "is_immutable": feat.is_immutable,
+            "is_categorical": feat.is_categorical,
+        })
+    return {"columns": columns, "feature_indices": features.feature_indices}
+
+def _load_features_snapshot(manifest: dict, path: Path) -> FeaturesList:
+    """Load `FeaturesList` saved by `_save_features_snapshot`. All arrays are memory-mapped lazily."""
+    transformed_data = np.load(path / "transformed_data.npy", mmap_mode='r')
+    transformations = load_pytree(path)
+    feats = []
+    for col, transformation, (start, end) in zip(manifest["columns"], transformations, manifest["feature_indices"]):
+        feats.append(Feature(
+            name=col["name"],
+            data=_load_array(path / col["file"], col["mmap"]),
+            transformation=transformation,
+            transformed_data=transformed_data[:, start:end],
+            is_immutable=col["is_immutable"],
+            is_categorical=col["is_categorical"],
+        ))
+    features = FeaturesList(feats)
+    # Reuse the saved transformed data instead of concatenating the transformed features.
+    features._transformed_data = transformed_data
+    features._feature_indices = [tuple(indices) for indices in manifest["feature_indices"]]
+    features._feature_name_indices = {
+        col["name"]: (i, *indices) for i, (col, indices) in enumerate(zip(manifest["columns"], manifest["feature_indices"]))
+    }
+    return features
+
+def _remove_stale_artifacts(path: Path, format: str):
+    """Remove the files which `DataModule.save` writes for the formats other than `format`."""
+    if format == 'snapshot':
+        stale = [path / 'data.csv']
+    else:
+        # The manifest would take precedence over `data.csv` when loading.
+        stale = [path / 'manifest.json', *path.glob('features/*.npy'), *path.glob('label/*.npy')]
+    for file in stale:
+        if file.exists():
+            file.unlink()
+
+# %% ../nbs/01_data.ipynb 29
 class DataModule(BaseDataModule, DataModuleInfoMixin):
     """DataModule for tabular data."""
 
@@ -195,8 +423,11 @@ class DataModule(BaseDataModule, DataModuleInfoMixin):
         if config is None:
             name = kwargs.pop('name', 'DataModule')
             config = features2config(features, name)
-        config.shuffle(self.xs, test_size=0.25)
-        self._data = features2pandas(features, label) if data is None else data
+        if len(config.train_indices) == 0 or len(config.test_indices) == 0:
+            config.shuffle(self.xs, test_size=0.25)
+        # If `data` is None, it is built from `features` and `label` when accessed.
+        self._data = data
+        self._neighbor_index = None
         super().__init__(config, name=config.data_name)
 
     def _prepare(self, features, label):
@@ -210,18 +441,33 @@ class DataModule(BaseDataModule, DataModuleInfoMixin):
             
     def save(
         self, 
-        path: str # Path to the directory to save `DataModule`
+        path: str, # Path to the directory to save `DataModule`
+        format: Literal['csv', 'snapshot'] = 'csv' # `snapshot` saves columns as `.npy` files, which are memory-mapped when loading
     ):
         """Save `DataModule` to a directory."""
         path = Path(path)
         if not path.exists():
             path.mkdir(parents=True)
-        self._features.save(path / 'features')
-        self._label.save(path / 'label')
-        if self._data is not None:
-            self._data.to_csv(path / 'data.csv', index=False)
-        with open(path / "config.json", "w") as f:
-            json.dump(self.config.dict(), f)
+        if format == 'snapshot':
+            _remove_stale_artifacts(path, format)
+            manifest = {
+                "format": _SNAPSHOT_FORMAT,
+                "version": _SNAPSHOT_VERSION,
+                "features": _save_features_snapshot(self._features, path / 'features'),
+                "label": _save_features_snapshot(self._label, path / 'label'),
+            }
+            with open(path / "manifest.json", "w") as f:
+                json.dump(manifest, f)
+        elif format == 'csv':
+            _remove_stale_artifacts(path, format)
+            self._features.save(path / 'features')
+            self._label.save(path / 'label')
+            self.data.to_csv(path / 'data.csv', index=False)
+        else:
+            raise ValueError(f"Unknown format: {format}. Should be one of ['csv', 'snapshot']")
+        self.config.save(path / "config.json")
+        if self._neighbor_index is not None:
+            self._neighbor_index.save(path / "neighbor_index.pkl")
 
     @classmethod
     def load_from_path(
@@ -236,10 +482,22 @@ class DataModule(BaseDataModule, DataModuleInfoMixin):
         path = Path(path)
         config = DataModuleConfig.load_from_json(path / 'config.json')
         # config = validate_configs(config, DataModuleConfig)
-        features = FeaturesList.load_from_path(path / 'features')
-        label = FeaturesList.load_from_path(path / 'label')
-        data = pd.read_csv(path / 'data.csv')
-        return cls(features=features, label=label, config=config, data=data)
+        if (path / 'manifest.json').exists():
+            manifest = load_json(path / 'manifest.json')
+            if manifest.get("format") != _SNAPSHOT_FORMAT or manifest.get("version") != _SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot: format={manifest.get('format')}, version={manifest.get('version')}.")
+            features = _load_features_snapshot(manifest["features"], path / 'features')
+            label = _load_features_snapshot(manifest["label"], path / 'label')
+            # The dataframe is built from the memory-mapped columns when accessed.
+            dm = cls(features=features, label=label, config=config)
+        else:
+            features = FeaturesList.load_from_path(path / 'features')
+            label = FeaturesList.load_from_path(path / 'label')
+            data = pd.read_csv(path / 'data.csv')
+            dm = cls(features=features, label=label, config=config, data=data)
+        if (path / 'neighbor_index.pkl').exists():
+            dm._neighbor_index = NearestNeighborIndex.load_from_path(path / 'neighbor_index.pkl', xs=dm.xs)
+        return dm
     
     @classmethod
     def from_path(cls, path, config: DataModuleConfig = None):
@@ -305,8 +563,17 @@ class DataModule(BaseDataModule, DataModuleInfoMixin):
         """Reset transformations for features."""
 
         self._features = self._features.set_transformations(feature_names_to_transformation)
+        # `xs` are changed, so the index needs to be rebuilt.
+        self._neighbor_index = None
         return self
     
+    @property
+    def neighbor_index(self) -> NearestNeighborIndex:
+        """Nearest neighbor index of `xs`. It is built when first accessed, and saved along with `DataModule`."""
+        if self._neighbor_index is None:
+            self._neighbor_index = NearestNeighborIndex(self.xs)
+        return self._neighbor_index
+
     def sample(
         self, 
         size: float | int, # Size of the sample. If float, should be 0<=size<=1.
@@ -392,7 +659,7 @@ class DataModule(BaseDataModule, DataModuleInfoMixin):
         'sample'
     ]
 
-# %% ../nbs/01_data.ipynb 22
+# %% ../nbs/01_data.ipynb 30
 def dm_equals(dm1: DataModule, dm2: DataModule):
     # data_equals = np.allclose(dm1.data.to_numpy(), dm2.data.to_numpy())
     assert_frame_equal(dm1.data, dm2.data)
@@ -406,7 +673,178 @@ def dm_equals(dm1: DataModule, dm2: DataModule):
         train_indices_equals and test_indices_equals
     )
 
-# %% ../nbs/01_data.ipynb 30
+# %% ../nbs/01_data.ipynb 39
+def _column_dtype(col: pd.Series) -> np.dtype:
+    """The dtype to store `col` in a `.npy` file. Strings are stored as fixed-width unicode."""
+    if col.dtype == object:
+        return np.dtype(f"U{max(col.astype(str).str.len().max(), 1)}")
+    return col.dtype
+
+def _csv_columns(config: DataModuleConfig, columns: List[str]) -> Tuple[List[str], List[str]]:
+    """Split the columns of the csv file into features and labels."""
+    feature_cols = config.continous_cols + config.discret_cols
+    label_cols = [col for col in columns if col not in feature_cols]
+    return feature_cols, label_cols
+
+class _FeaturesSnapshotWriter:
+    """Write `Feature`s chunk by chunk into the layout of `_save_features_snapshot`."""
+
+    def __init__(
+        self, 
+        path: Path, 
+        feats: List[Feature], # Features with fitted transformations
+        dtypes: List[np.dtype], # dtypes of the columns
+        n_rows: int
+    ):
+        path.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.feats = feats
+        self.n_rows = n_rows
+        self.columns = [
+            np.lib.format.open_memmap(path / f"{i}.npy", mode='w+', dtype=dtype, shape=(n_rows, 1))
+            for i, dtype in enumerate(dtypes)
+        ]
+        self.transformed_data = None
+        self.start = 0
+
+    def write(self, data: List[np.ndarray]):
+        """Append a chunk of columns."""
+        transformed = [np.asarray(feat.transform(xs)) for feat, xs in zip(self.feats, data)]
+        if self.transformed_data is None:
+            # The widths and dtype of the transformed data are known after transforming the first chunk.
+            self.widths = [t.shape[-1] for t in transformed]
+            self.transformed_data = np.lib.format.open_memmap(
+                self.path / "transformed_data.npy", mode='w+', 
+                dtype=np.result_type(*transformed), shape=(self.n_rows, sum(self.widths))
+            )
+        end = self.start + data[0].shape[0]
+        for column, xs in zip(self.columns, data):
+            column[self.start:end] = xs.astype(column.dtype)
+        self.transformed_data[self.start:end] = np.concatenate(transformed, axis=-1)
+        self.start = end
+
+    def close(self) -> dict:
+        """Flush the written arrays, and return their manifest."""
+        for arr in [self.transformed_data, *self.columns]:
+            arr.flush()
+        save_pytree([feat.transformation.to_dict() for feat in self.feats], self.path)
+        feature_indices = np.cumsum([0] + self.widths)
+        return {
+            "columns": [{
+                "name": feat.name,
+                "file": f"{i}.npy",
+                "mmap": True,
+                "is_immutable": feat.is_immutable,
+                "is_categorical": feat.is_categorical,
+            } for i, feat in enumerate(self.feats)],
+            "feature_indices": [(int(s), int(e)) for s, e in zip(feature_indices[:-1], feature_indices[1:])],
+        }
+
+# %% ../nbs/01_data.ipynb 40
+class OutOfCoreDataModule(DataModule):
+    """`DataModule` whose data are memory-mapped from disk, and processed chunk by chunk."""
+
+    def __init__(
+        self, 
+        *args, 
+        chunk_size: int = 2**16, # Number of rows in each chunk
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_csv(
+        cls,
+        config: Dict|DataModuleConfig, # Configs of `DataModule`. `config.data_dir` is the path to the csv file.
+        path: str, # Directory to store the processed data
+        chunk_size: int = 2**16 # Number of rows read into memory at a time
+    ) -> OutOfCoreDataModule:
+        """Process a csv file chunk by chunk and store it at `path`."""
+        config = validate_configs(config, DataModuleConfig)
+        path = Path(path)
+        read_chunks = lambda: pd.read_csv(config.data_dir, chunksize=chunk_size)
+        
+        # First pass: fit the transformations, and infer the dtypes and number of rows.
+        n_rows, dtypes, feats = 0, {}, None
+        for chunk in read_chunks():
+            if feats is None:
+                feature_cols, label_cols = _csv_columns(config, list(chunk.columns))
+                transformations = (
+                    [config.continuous_transformation] * len(config.continous_cols) + 
+                    [config.discret_transformation] * len(config.discret_cols) + 
+                    ['identity'] * len(label_cols)
+                )
+                feats = {
+                    col: Feature(col, None, transformation=t, is_immutable=col in config.imutable_cols) 
+                    for col, t in zip(feature_cols + label_cols, transformations)
+                }
+            for col, feat in feats.items():
+                feat.transformation.partial_fit(chunk[col].to_numpy().reshape(-1, 1))
+                dtype = _column_dtype(chunk[col])
+                dtypes[col] = np.promote_types(dtypes.get(col, dtype), dtype)
+            n_rows += len(chunk)
+        if feats is None:
+            raise ValueError(f"No data found in {config.data_dir}.")
+
+        # Second pass: write the columns and the transformed data.
+        writers = {
+            stage: _FeaturesSnapshotWriter(
+                path / stage, [feats[col] for col in cols], [dtypes[col] for col in cols], n_rows
+            ) for stage, cols in [('features', feature_cols), ('label', label_cols)]
+        }
+        for chunk in read_chunks():
+            for writer in writers.values():
+                writer.write([chunk[feat.name].to_numpy().reshape(-1, 1) for feat in writer.feats])
+        manifest = {"format": _SNAPSHOT_FORMAT, "version": _SNAPSHOT_VERSION}
+        manifest.update({stage: writer.close() for stage, writer in writers.items()})
+        with open(path / "manifest.json", "w") as f:
+            json.dump(manifest, f)
+        config.save(path / "config.json")
+        
+        # Store the train/test split generated when loading the data.
+        dm = cls.load_from_path(path, chunk_size=chunk_size)
+        dm.config.save(path / "config.json")
+        return dm
+    
+    @classmethod
+    def load_from_path(
+        cls, 
+        path: str, # Path to the directory to load `DataModule`
+        config: Dict|DataModuleConfig = None, # Configs of `DataModule`. This argument is ignored.
+        chunk_size: int = 2**16 # Number of rows in each chunk
+    ) -> OutOfCoreDataModule:
+        """Load `OutOfCoreDataModule` from a directory saved with `format='snapshot'`."""
+        if not (Path(path) / 'manifest.json').exists():
+            raise ValueError(f"{path} is not a snapshot. Save the `DataModule` with `format='snapshot'` first.")
+        dm = super().load_from_path(path, config)
+        dm.chunk_size = chunk_size
+        return dm
+
+    def iter_chunks(
+        self, 
+        stage: str = None, # One of ['train', 'valid', 'test']. If None, iterate all rows.
+        chunk_size: int = None # Number of rows in each chunk. Default to `self.chunk_size`.
+    ) -> Iterable[Tuple[np.ndarray, np.ndarray]]: # Yield `(xs, ys)` for each chunk
+        """Iterate over `(xs, ys)` chunk by chunk."""
+        chunk_size = chunk_size or self.chunk_size
+        if stage is None:
+            for start in range(0, self.xs.shape[0], chunk_size):
+                yield np.asarray(self.xs[start:start + chunk_size]), np.asarray(self.ys[start:start + chunk_size])
+            return
+        if stage == 'train':
+            indices = self.config.train_indices
+        elif stage in ['valid', 'test']:
+            indices = self.config.test_indices
+        else:
+            raise ValueError(f"Unknown data name: {stage}. Should be one of ['train', 'valid', 'test']")
+        for start in range(0, len(indices), chunk_size):
+            chunk_indices = np.asarray(indices[start:start + chunk_size])
+            yield self.xs[chunk_indices], self.ys[chunk_indices]
+
+    __ALL__ = ['from_csv', 'load_from_path', 'iter_chunks']
+
+# %% ../nbs/01_data.ipynb 43
 class TabularDataModuleConfigs(DataModuleConfig):
     """!!!Deprecated!!! - Configurator of `TabularDataModule`."""
     def __ini__(self, *args, **kwargs):
@@ -414,7 +852,7 @@ class TabularDataModuleConfigs(DataModuleConfig):
         warnings.warn("TabularDataModuleConfigs is deprecated since v0.2, please use DataModuleConfig instead.", 
                       DeprecationWarning)
 
-# %% ../nbs/01_data.ipynb 31
+# %% ../nbs/01_data.ipynb 44
 class TabularDataModule(DataModule):
     """!!!Deprecated!!! - DataModule for tabular data."""
     def __init__(self, *args, **kwargs):
@@ -424,7 +862,7 @@ class TabularDataModule(DataModule):
         
     __ALL__ = []
 
-# %% ../nbs/01_data.ipynb 33
+# %% ../nbs/01_data.ipynb 46
 DEFAULT_DATA = [
     'adult',
     'heloc',
@@ -449,13 +887,13 @@ DEFAULT_DATA_CONFIGS = {
     } for data in DEFAULT_DATA
 }
 
-# %% ../nbs/01_data.ipynb 38
+# %% ../nbs/01_data.ipynb 51
 def _validate_dataname(data_name: str):
     if data_name not in DEFAULT_DATA:
         raise ValueError(f'`data_name` must be one of {DEFAULT_DATA}, '
             f'but got data_name={data_name}.')
 
-# %% ../nbs/01_data.ipynb 39
+# %% ../nbs/01_data.ipynb 52
 def download_data_module_files(
     data_name: str, # The name of data
     data_parent_dir: Path, # The directory to save data.
@@ -16,7 +16,7 @@ import chex
 # %% auto 0
 __all__ = ['PREPROCESSING_TRANSFORMATIONS', 'DataPreprocessor', 'MinMaxScaler', 'EncoderPreprocessor', 'OrdinalPreprocessor',
            'OneHotEncoder', 'Transformation', 'MinMaxTransformation', 'OneHotTransformation', 'OrdinalTransformation',
-           'IdentityTransformation', 'Feature', 'FeaturesList']
+           'IdentityTransformation', 'Feature', 'feature_segment_ids', 'FeaturesList']
 
 # %% ../nbs/01_data.utils.ipynb 5
 def _check_xs(xs: np.ndarray, name: str):
@@ -37,6 +37,10 @@ class DataPreprocessor:
         """Fit the preprocessor with `xs` and `y`."""
         raise NotImplementedError
     
+    def partial_fit(self, xs, y=None):
+        """Update the fitted preprocessor with a chunk of `xs` and `y`."""
+        raise NotImplementedError
+    
     def transform(self, xs):
         """Transform `xs`."""
         raise NotImplementedError
@@ -58,7 +62,7 @@ class DataPreprocessor:
         """Load the attributes of the preprocessor from a dictionary."""
         raise NotImplementedError
         
-    __ALL__ = ["fit", "transform", "fit_transform", "inverse_transform", "to_dict", "from_dict"]
+    __ALL__ = ["fit", "partial_fit", "transform", "fit_transform", "inverse_transform", "to_dict", "from_dict"]
 
 # %% ../nbs/01_data.utils.ipynb 6
 class MinMaxScaler(DataPreprocessor): 
@@ -71,6 +75,14 @@ class MinMaxScaler(DataPreprocessor):
         self.max_ = xs.max(axis=0)
         return self
     
+    def partial_fit(self, xs, y=None):
+        if not hasattr(self, "min_"):
+            return self.fit(xs, y)
+        _check_xs(xs, name="MinMaxScaler")
+        self.min_ = np.minimum(self.min_, xs.min(axis=0))
+        self.max_ = np.maximum(self.max_, xs.max(axis=0))
+        return self
+    
     def transform(self, xs):
         return (xs - self.min_) / (self.max_ - self.min_)
     
@@ -102,6 +114,12 @@ class EncoderPreprocessor(DataPreprocessor):
         _check_xs(xs, name="EncoderPreprocessor")
         self.categories_ = _unique(xs)
 
+    def _partial_fit(self, xs, y=None):
+        if not hasattr(self, "categories_"):
+            return self._fit(xs, y)
+        _check_xs(xs, name="EncoderPreprocessor")
+        self.categories_ = np.union1d(self.categories_, _unique(xs))
+
     def _transform(self, xs):
         """Transform data to ordinal encoding."""
         if xs.dtype == object:
@@ -129,6 +147,10 @@ class OrdinalPreprocessor(EncoderPreprocessor):
         self._fit(xs, y)
         return self
     
+    def partial_fit(self, xs, y=None):
+        self._partial_fit(xs, y)
+        return self
+    
     def transform(self, xs):
         if xs.ndim == 1:
             raise ValueError(f"OrdinalPreprocessor only supports 2D array with a single feature, "
@@ -145,6 +167,10 @@ class OneHotEncoder(EncoderPreprocessor):
     def fit(self, xs, y=None):
         self._fit(xs, y)
         return self
+    
+    def partial_fit(self, xs, y=None):
+        self._partial_fit(xs, y)
+        return self
 
     def transform(self, xs):
         if xs.ndim == 1:
@@ -171,6 +197,10 @@ class Transformation:
     def fit(self, xs, y=None):
         self.transformer.fit(xs)
         return self
+
+    def partial_fit(self, xs, y=None):
+        self.transformer.partial_fit(xs)
+        return self
     
     def transform(self, xs):
         return self.transformer.transform(xs)
@@ -239,6 +269,9 @@ class IdentityTransformation(Transformation):
 
     def fit(self, xs, y=None):
         return self
+
+    def partial_fit(self, xs, y=None):
+        return self
     
     def transform(self, xs):
         return xs
@@ -407,6 +440,109 @@ class Feature:
         return self.transformation.compute_reg_loss(xs, cfs, hard)
 
 # %% ../nbs/01_data.utils.ipynb 31
+def feature_segment_ids(
+    feature_indices: list[tuple[int, int]] # [(start, end), ...] of each feature
+) -> np.ndarray: # Index of the feature that each column belongs to
+    """Convert `feature_indices` to segment ids, which can be used by `jax.ops.segment_*` operations."""
+    segment_ids = np.zeros(feature_indices[-1][1] if len(feature_indices) > 0 else 0, dtype=np.int32)
+    for i, (start, end) in enumerate(feature_indices):
+        segment_ids[start:end] = i
+    return segment_ids
+
+# %% ../nbs/01_data.utils.ipynb 32
+# Constraints and regularization losses of the built-in transformations, keyed by their methods.
+_KERNEL_CONSTRAINTS = {
+    Transformation.apply_constraints: None,
+    IdentityTransformation.apply_constraints: None,
+    MinMaxTransformation.apply_constraints: 'clip',
+    OneHotTransformation.apply_constraints: 'softmax',
+}
+_KERNEL_REG_LOSSES = {
+    Transformation.compute_reg_loss: None,
+    OneHotTransformation.compute_reg_loss: 'sum_to_one',
+}
+
+class _ConstraintsKernel:
+    """Apply the constraints and compute the regularization loss of all features at once. 
+    Min-max columns are clipped with a single mask, one-hot groups are handled with segment operations, 
+    and immutable columns are restored with a single `jnp.where`.
+    """
+
+    def __init__(self, features_and_indices: list[tuple[Feature, tuple[int, int]]]):
+        feature_indices = [indices for _, indices in features_and_indices]
+        n_cols = feature_indices[-1][1]
+        self.clip_mask = np.zeros(n_cols, dtype=bool)
+        self.ohe_mask = np.zeros(n_cols, dtype=bool)
+        self.immutable_mask = np.zeros(n_cols, dtype=bool)
+        for feat, (start, end) in features_and_indices:
+            constraint = _KERNEL_CONSTRAINTS[type(feat.transformation).apply_constraints]
+            self.clip_mask[start:end] = constraint == 'clip'
+            self.ohe_mask[start:end] = constraint == 'softmax'
+            self.immutable_mask[start:end] = feat.is_immutable
+        self.reg_loss_mask = np.array([
+            _KERNEL_REG_LOSSES[type(feat.transformation).compute_reg_loss] == 'sum_to_one' 
+            for feat, _ in features_and_indices
+        ])
+        # Each one-hot group is a segment; the columns which are not one-hot encoded are put in an extra segment.
+        self.feature_ids = feature_segment_ids(feature_indices)
+        self.n_segments = len(feature_indices) + 1
+        self.segment_ids = np.where(self.ohe_mask, self.feature_ids, self.n_segments - 1)
+        self._jitted_fn = jax.jit(self._apply_constraints)
+        self._jitted_reg_loss_fn = jax.jit(self._compute_reg_loss)
+
+    @staticmethod
+    def is_supported(features: list[Feature]) -> bool:
+        """Whether the constraints of all features are known to the kernel."""
+        return len(features) > 0 and all(
+            type(feat.transformation).apply_constraints in _KERNEL_CONSTRAINTS and
+            type(feat.transformation).compute_reg_loss in _KERNEL_REG_LOSSES
+            for feat in features
+        )
+
+    def _segment_softmax(self, cfs, hard):
+        cfs = cfs.T # Segment operations are applied on the leading axis
+        seg_max = jax.ops.segment_max(cfs, self.segment_ids, self.n_segments)[self.segment_ids]
+
+        def softmax(cfs):
+            exp = jnp.exp(cfs - seg_max)
+            return exp / jax.ops.segment_sum(exp, self.segment_ids, self.n_segments)[self.segment_ids]
+        
+        def one_hot(cfs):
+            # Keep the first maximum in each segment, as `jnp.argmax` does.
+            cols = jnp.where(cfs == seg_max, jnp.arange(cfs.shape[0])[:, None], cfs.shape[0])
+            first = jax.ops.segment_min(cols, self.segment_ids, self.n_segments)[self.segment_ids]
+            return (cols == first).astype(cfs.dtype)
+
+        return jax.lax.cond(hard, one_hot, softmax, cfs).T
+
+    def _apply_constraints(self, xs, cfs, hard):
+        shape = cfs.shape
+        cfs = cfs.reshape(-1, shape[-1])
+        if self.clip_mask.any():
+            cfs = jnp.where(self.clip_mask, jnp.clip(cfs, 0., 1.), cfs)
+        if self.ohe_mask.any():
+            cfs = jnp.where(self.ohe_mask, self._segment_softmax(cfs, hard), cfs)
+        cfs = cfs.reshape(shape)
+        if self.immutable_mask.any():
+            cfs = jnp.where(self.immutable_mask, jnp.broadcast_to(xs, shape), cfs)
+        return cfs
+
+    def _compute_reg_loss(self, xs, cfs):
+        cfs = cfs.reshape(-1, cfs.shape[-1])
+        # The sum of each one-hot group should be one.
+        group_sums = jax.ops.segment_sum(cfs.T, self.feature_ids, len(self.reg_loss_mask))
+        reg_losses = ((group_sums - 1.) ** 2).mean(axis=-1)
+        return jnp.where(self.reg_loss_mask, reg_losses, 0.).sum()
+
+    def __call__(self, xs, cfs, hard: bool = False):
+        return self._jitted_fn(xs, cfs, hard)
+
+    def compute_reg_loss(self, xs, cfs, hard: bool = False):
+        if not self.reg_loss_mask.any():
+            return 0.
+        return self._jitted_reg_loss_fn(xs, cfs)
+
+# %% ../nbs/01_data.utils.ipynb 33
 class FeaturesList:
     def __init__(
         self,
@@ -514,6 +650,7 @@ class FeaturesList:
         for feat, transformation in feature_names_to_transformation.items():
             self[feat].set_transformation(transformation)
         self._transformed_data = None # Reset transformed data
+        self._constraints_kernel = None
         return self
         
     def _transform_data(self):
@@ -548,11 +685,25 @@ class FeaturesList:
             orignial_data[feat.name] = feat.inverse_transform(xs[:, start:end])
         return orignial_data
 
+    def _get_constraints_kernel(self) -> _ConstraintsKernel | None:
+        if not hasattr(self, "_constraints_kernel") or self._constraints_kernel is None:
+            # Features with custom transformations are handled one by one.
+            self._constraints_kernel = (
+                _ConstraintsKernel(self.features_and_indices) if _ConstraintsKernel.is_supported(self.features) else False
+            )
+        return self._constraints_kernel or None
+
     def apply_constraints(self, xs, cfs, hard: bool = False):
+        kernel = self._get_constraints_kernel()
+        if kernel is not None:
+            return kernel(xs, cfs, hard)
         return jnp.concatenate(
             [feat.apply_constraints(xs[:, start:end], cfs[:, start:end], hard) for feat, (start, end) in self.features_and_indices], axis=-1)
     
     def compute_reg_loss(self, xs, cfs, hard: bool = False):
+        kernel = self._get_constraints_kernel()
+        if kernel is not None:
+            return kernel.compute_reg_loss(xs, cfs, hard)
         reg_loss = 0.
         for feat, (start, end) in self.features_and_indices:
             reg_loss += feat.compute_reg_loss(xs[:, start:end], cfs[:, start:end], hard)
@@ -6,13 +6,15 @@ from __future__ import annotations
 from .import_essentials import *
 from .base import *
 from .explain import *
+from .data_utils import feature_segment_ids
 from keras.metrics import sparse_categorical_accuracy
 import einops
 
 # %% auto 0
 __all__ = ['BaseEvalMetrics', 'PredictiveAccuracy', 'compute_single_validity', 'compute_validity', 'Validity',
-           'compute_single_proximity', 'compute_proximity', 'Proximity', 'compute_single_sparsity', 'compute_sparsity',
-           'Sparsity', 'ManifoldDist', 'Runtime', 'evaluate_cfs', 'benchmark_cfs']
+           'compute_single_proximity', 'compute_proximity', 'Proximity', 'compute_feature_changes',
+           'compute_single_sparsity', 'compute_sparsity', 'Sparsity', 'ManifoldDist', 'Runtime', 'MetricAccumulator',
+           'evaluate_cfs', 'accumulate_cfs', 'benchmark_cfs']
 
 # %% ../nbs/04_evaluate.ipynb 6
 class BaseEvalMetrics:
@@ -34,6 +36,9 @@ class BaseEvalMetrics:
     def __call__(self, explanation: Explanation) -> Any:
         raise NotImplementedError
 
+    def per_instance(self, explanation: Explanation) -> Array: # (n,)
+        """Compute the metric of each input instance, averaged over its CF examples."""
+        raise NotImplementedError(f"`{self.name}` does not support per-instance evaluation.")
 
 # %% ../nbs/04_evaluate.ipynb 7
 class PredictiveAccuracy(BaseEvalMetrics):
@@ -49,6 +54,10 @@ class PredictiveAccuracy(BaseEvalMetrics):
         accuracy = sparse_categorical_accuracy(ys, pred_ys)
         return accuracy.mean()
 
+    def per_instance(self, explanation: Explanation) -> Array:
+        xs, ys = explanation.xs, explanation.ys
+        return sparse_categorical_accuracy(ys, explanation.pred_fn(xs)).reshape(-1)
+
 # %% ../nbs/04_evaluate.ipynb 9
 def compute_single_validity(
     xs: Array, # (n, d)
@@ -82,6 +91,12 @@ class Validity(BaseEvalMetrics):
         xs, cfs, pred_fn = explanation.xs, explanation.cfs, explanation.pred_fn
         return compute_validity(xs, cfs, pred_fn)
 
+    def per_instance(self, explanation: Explanation) -> Array:
+        xs, cfs, pred_fn = explanation.xs, explanation.cfs, explanation.pred_fn
+        y_xs = pred_fn(xs).argmax(axis=-1)
+        y_cfs = pred_fn(cfs.reshape(-1, cfs.shape[-1])).argmax(axis=-1).reshape(cfs.shape[:2])
+        return jnp.not_equal(y_xs[:, None], y_cfs).mean(axis=1)
+
 # %% ../nbs/04_evaluate.ipynb 13
 def compute_single_proximity(xs: Array, cfs: Array):
     prox = jnp.linalg.norm(xs - cfs, ord=1, axis=1).mean()
@@ -102,15 +117,23 @@ class Proximity(BaseEvalMetrics):
         xs, cfs = explanation.xs, explanation.cfs
         return compute_proximity(xs, cfs)
 
+    def per_instance(self, explanation: Explanation) -> Array:
+        xs, cfs = explanation.xs, explanation.cfs
+        return jnp.abs(xs[:, None, :] - cfs).sum(axis=-1).mean(axis=1)
+
 # %% ../nbs/04_evaluate.ipynb 17
+def compute_feature_changes(
+    xs: Array, # (n, d)
+    cfs: Array, # (n, d)
+    feature_indices: List[Tuple[int, int]]
+) -> Array: # (n, n_features)
+    """Count the changed columns of each feature."""
+    segment_ids = feature_segment_ids(feature_indices)
+    changes = (xs - cfs != 0).astype(jnp.float32)
+    return jax.ops.segment_sum(changes.T, segment_ids, len(feature_indices)).T
+
 def compute_single_sparsity(xs: Array, cfs: Array, feature_indices: List[Tuple[int, int]]):
-    def _feat_sparsity(xs, cfs, feat_indices):
-        start, end = feat_indices
-        xs = xs[:, start: end]
-        cfs = cfs[:, start: end]
-        return jnp.linalg.norm(xs - cfs, ord=0, axis=1).mean()
-    
-    return jnp.stack([_feat_sparsity(xs, cfs, feat_indices) for feat_indices in feature_indices]).mean()
+    return compute_feature_changes(xs, cfs, feature_indices).mean()
 
 def compute_sparsity(xs: Array, cfs: Array, feature_indices: List[Tuple[int, int]]) -> float:
     cfs = einops.rearrange(cfs, 'n ... d -> n (...) d')
@@ -128,6 +151,12 @@ class Sparsity(BaseEvalMetrics):
         xs, cfs, feature_indices = explanation.xs, explanation.cfs, explanation.feature_indices
         return compute_sparsity(xs, cfs, feature_indices)
 
+    def per_instance(self, explanation: Explanation) -> Array:
+        xs, cfs, feature_indices = explanation.xs, explanation.cfs, explanation.feature_indices
+        n, c, d = cfs.shape
+        changes = compute_feature_changes(jnp.repeat(xs, c, axis=0), cfs.reshape(n * c, d), feature_indices)
+        return changes.mean(axis=-1).reshape(n, c).mean(axis=1)
+
 # %% ../nbs/04_evaluate.ipynb 20
 @partial(jit, static_argnums=(2))
 def pairwise_distances(
@@ -174,11 +203,15 @@ class ManifoldDist(BaseEvalMetrics):
         self.n_neighbors = n_neighbors
         
     def __call__(self, explanation: Explanation) -> float:
-        xs, cfs = explanation.xs, explanation.cfs
-        l2_ann_partial = ft.partial(l2_ann, k=self.n_neighbors)
-        dists, _ = vmap(l2_ann_partial, in_axes=(1, None))(cfs, xs)
+        cfs = explanation.cfs
+        dists, _ = explanation.neighbor_index.query(cfs.reshape(-1, cfs.shape[-1]), k=self.n_neighbors)
         return dists.mean()
 
+    def per_instance(self, explanation: Explanation) -> Array:
+        cfs = explanation.cfs
+        dists, _ = explanation.neighbor_index.query(cfs.reshape(-1, cfs.shape[-1]), k=self.n_neighbors)
+        return dists.reshape(cfs.shape[0], -1).mean(axis=1)
+
 # %% ../nbs/04_evaluate.ipynb 24
 class Runtime(BaseEvalMetrics):
     """Compute the runtime of the CF explanation method."""
@@ -188,7 +221,7 @@ class Runtime(BaseEvalMetrics):
     def __call__(self, explanation: Explanation) -> float:
         return explanation.total_time
 
-# %% ../nbs/04_evaluate.ipynb 27
+# %% ../nbs/04_evaluate.ipynb 28
 METRICS_CALLABLE = [
     PredictiveAccuracy('acc'),
     PredictiveAccuracy('accuracy'),
@@ -202,32 +235,237 @@ METRICS = { m.name: m for m in METRICS_CALLABLE }
 
 DEFAULT_METRICS = ["acc", "validity", "proximity"]
 
-# %% ../nbs/04_evaluate.ipynb 29
-def _get_metric(metric: str | BaseEvalMetrics, cf_exp: Explanation):
+# %% ../nbs/04_evaluate.ipynb 30
+def _resolve_metric(metric: str | BaseEvalMetrics) -> BaseEvalMetrics:
     if isinstance(metric, str):
         if metric not in METRICS.keys():
             raise ValueError(f"'{metric}' is not supported. Must be one of {METRICS.keys()}")
-        res = METRICS[metric](cf_exp)
+        return METRICS[metric]
     elif callable(metric):
         # f(cf_exp) not supported for now
         if not isinstance(metric, BaseEvalMetrics):
             raise ValueError(f"metric needs to be a subclass of `BaseEvalMetrics`.")
-        res = metric(cf_exp)
+        return metric
     else:
         raise ValueError(f"{type(metric).__name__} is not supported as a metric.")
+
+def _get_metric(metric: str | BaseEvalMetrics, cf_exp: Explanation):
+    res = _resolve_metric(metric)(cf_exp)
     
     # Get scalar value
     if isinstance(res, Array) and res.ravel().shape == (1,):
         res = res.item()
     return res
 
-
-# %% ../nbs/04_evaluate.ipynb 31
+# %% ../nbs/04_evaluate.ipynb 33
+class MetricAccumulator:
+    """Mergeable summary of per-instance metric values: count, sum, sum of squares, min, max and a quantile sketch."""
+
+    def __init__(
+        self, 
+        sketch_size: int = 2048 # Maximum number of values kept by the quantile sketch
+    ):
+        self.sketch_size = sketch_size
+        self.count = 0
+        self.sum = 0.
+        self.sum_sq = 0.
+        self.min = np.inf
+        self.max = -np.inf
+        # Weighted values which approximate the distribution of all values
+        self._values = np.empty(0)
+        self._weights = np.empty(0)
+
+    def update(
+        self, 
+        values: Array # Per-instance metric values
+    ) -> MetricAccumulator:
+        """Add `values` to the accumulator."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.sum += values.sum()
+        self.sum_sq += np.square(values).sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._add_to_sketch(values, np.ones_like(values))
+        return self
+
+    def merge(
+        self, 
+        other: MetricAccumulator # Accumulator to be merged into this one
+    ) -> MetricAccumulator:
+        """Merge `other` into the accumulator."""
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_sq += other.sum_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._add_to_sketch(other._values, other._weights)
+        return self
+
+    def _add_to_sketch(self, values: np.ndarray, weights: np.ndarray):
+        values = np.concatenate([self._values, values])
+        weights = np.concatenate([self._weights, weights])
+        if values.size > self.sketch_size:
+            # Compact the sketch to the values at evenly spaced ranks.
+            order = np.argsort(values, kind='stable')
+            values, weights = values[order], weights[order]
+            ranks = np.cumsum(weights) - weights / 2
+            size = self.sketch_size // 2
+            targets = (np.arange(size) + 0.5) * weights.sum() / size
+            values = values[np.searchsorted(ranks, targets).clip(max=values.size - 1)]
+            weights = np.full(size, weights.sum() / size)
+        self._values, self._weights = values, weights
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count > 0 else np.nan
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(max(self.sum_sq / self.count - self.mean ** 2, 0.)) if self.count > 0 else np.nan
+
+    def quantile(
+        self, 
+        q: float | Array # Quantile(s) in [0, 1]
+    ) -> float | np.ndarray: # Approximated quantile(s)
+        """Approximate the quantiles of the accumulated values."""
+        if self.count == 0:
+            return np.full_like(q, np.nan, dtype=float) if np.ndim(q) > 0 else np.nan
+        order = np.argsort(self._values, kind='stable')
+        values, weights = self._values[order], self._weights[order]
+        positions = (np.cumsum(weights) - weights / 2) / weights.sum()
+        res = np.interp(q, positions, values).clip(self.min, self.max)
+        return res.item() if np.ndim(q) == 0 else res
+
+# %% ../nbs/04_evaluate.ipynb 36
+def _fused_spec(metric: BaseEvalMetrics) -> tuple | None:
+    """The statistic of `metric` in the fused evaluation. Return None if `metric` should be evaluated on its own."""
+    # Subclasses might override `__call__`, so only the built-in metrics are fused.
+    if type(metric) is PredictiveAccuracy: return ('accuracy',)
+    if type(metric) is Validity: return ('validity',)
+    if type(metric) is Proximity: return ('proximity',)
+    if type(metric) is Sparsity: return ('sparsity',)
+    if type(metric) is ManifoldDist: return ('manifold_dist', metric.n_neighbors)
+    return None
+
+@ft.partial(jax.jit, static_argnames=['specs', 'feature_indices'])
+def _fused_metric_stats(
+    xs: Array, # (b, d)
+    ys: Array, # (b, ...)
+    cfs: Array, # (b, c, d)
+    y_xs: Array, # (b,) Predicted labels of `xs`. Required by `PredictiveAccuracy` and `Validity`
+    y_cfs: Array, # (b * c,) Predicted labels of the flattened `cfs`. Required by `Validity`
+    specs: Tuple[tuple], # Statistics to compute, except `manifold_dist`. See `_fused_spec`.
+    feature_indices: Tuple[Tuple[int, int]] = None, # Required by `Sparsity`
+) -> Dict[tuple, Array]: # Per-instance values of each statistic
+    b, c, d = cfs.shape
+    xs_rep = jnp.repeat(xs, c, axis=0) # Align `xs` with the flattened `cfs`
+    cfs = cfs.reshape(b * c, d)
+    
+    stats_dict = {}
+    for spec in specs:
+        if spec[0] == 'accuracy':
+            stats = jnp.equal(y_xs, ys.reshape(b, -1)[:, 0])
+        else:
+            if spec[0] == 'validity':
+                stats = jnp.not_equal(jnp.repeat(y_xs, c), y_cfs)
+            elif spec[0] == 'proximity':
+                stats = jnp.abs(xs_rep - cfs).sum(axis=-1)
+            elif spec[0] == 'sparsity':
+                stats = compute_feature_changes(xs_rep, cfs, feature_indices).mean(axis=-1)
+            # Average over the counterfactuals of each instance
+            stats = stats.reshape(b, c).mean(axis=-1)
+        stats_dict[spec] = stats
+    return stats_dict
+
+def _pad_chunk(x: Array, start: int, end: int, chunk_size: int) -> Array:
+    # Pad the last chunk, so that all chunks share the compiled program.
+    return jnp.pad(jnp.asarray(x[start:end]), [(0, chunk_size - (end - start))] + [(0, 0)] * (x.ndim - 1), mode='edge')
+
+def _evaluate_fused(
+    cf_exps: List[Explanation], # Explanations sharing `pred_fn`, `feature_indices`, and the shapes of `cfs` and `ys`
+    metrics: List[BaseEvalMetrics],
+    chunk_size: int = None, # Number of rows in each chunk. If None, evaluate all rows at once.
+) -> List[Dict[tuple, MetricAccumulator]]: # Return {spec: accumulator} of each explanation
+    specs = tuple(dict.fromkeys(spec for spec in map(_fused_spec, metrics) if spec is not None))
+    accumulators = [{spec: MetricAccumulator() for spec in specs} for _ in cf_exps]
+    if len(specs) == 0:
+        return accumulators
+    # Nearest neighbors are searched in the prebuilt index of each explanation, outside the jitted program.
+    knn_specs = tuple(spec for spec in specs if spec[0] == 'manifold_dist')
+    jit_specs = tuple(spec for spec in specs if spec[0] != 'manifold_dist')
+
+    for cf_exp, accs in zip(cf_exps, accumulators):
+        if len(knn_specs) == 0: break
+        n_instances = cf_exp.xs.shape[0]
+        size = min(chunk_size or n_instances, n_instances)
+        for start in range(0, n_instances, size):
+            end = min(start + size, n_instances)
+            chunk_cfs = _pad_chunk(cf_exp.cfs, start, end, size)
+            for spec in knn_specs:
+                dists, _ = cf_exp.neighbor_index.query(chunk_cfs.reshape(-1, chunk_cfs.shape[-1]), k=spec[1])
+                accs[spec].update(dists.reshape(size, -1).mean(axis=-1)[:end - start])
+
+    if len(jit_specs) > 0:
+        # Rows of all explanations are evaluated in the same chunks.
+        if len(cf_exps) == 1:
+            xs, ys, cfs = cf_exps[0].xs, cf_exps[0].ys, cf_exps[0].cfs
+        else:
+            xs, ys, cfs = (np.concatenate([np.asarray(getattr(exp, attr)) for exp in cf_exps]) for attr in ('xs', 'ys', 'cfs'))
+        offsets = np.cumsum([0] + [exp.xs.shape[0] for exp in cf_exps])
+        n_instances = offsets[-1]
+        size = min(chunk_size or n_instances, n_instances)
+        feature_indices = tuple(map(tuple, cf_exps[0].feature_indices)) if ('sparsity',) in specs else None
+        pred_fn = cf_exps[0].pred_fn
+        for start in range(0, n_instances, size):
+            end = min(start + size, n_instances)
+            chunk_xs, chunk_cfs = _pad_chunk(xs, start, end, size), _pad_chunk(cfs, start, end, size)
+            # Predictions are made outside the jitted program, which would otherwise bake in the current weights of `pred_fn`.
+            y_xs, y_cfs = None, None
+            if ('accuracy',) in jit_specs or ('validity',) in jit_specs:
+                y_xs = pred_fn(chunk_xs).argmax(axis=-1)
+            if ('validity',) in jit_specs:
+                y_cfs = pred_fn(chunk_cfs.reshape(-1, chunk_cfs.shape[-1])).argmax(axis=-1)
+            chunk_stats = _fused_metric_stats(
+                chunk_xs, _pad_chunk(ys, start, end, size), chunk_cfs, y_xs, y_cfs, 
+                specs=jit_specs, feature_indices=feature_indices
+            )
+            chunk_stats = {spec: np.asarray(stats) for spec, stats in chunk_stats.items()}
+            for accs, lo, hi in zip(accumulators, offsets[:-1], offsets[1:]):
+                lo, hi = max(lo, start), min(hi, end)
+                if lo >= hi: continue
+                for spec, stats in chunk_stats.items():
+                    accs[spec].update(stats[lo - start:hi - start])
+    return accumulators
+
+def _evaluate_group(
+    cf_exps: List[Explanation], # Explanations sharing `pred_fn`, `feature_indices`, and the shapes of `cfs` and `ys`
+    metrics: List[BaseEvalMetrics],
+    chunk_size: int = None,
+) -> List[Dict[str, Any]]: # Return {metric_name: value} of each explanation
+    fused_accumulators = _evaluate_fused(cf_exps, metrics, chunk_size)
+    results = []
+    for cf_exp, accs in zip(cf_exps, fused_accumulators):
+        res = {}
+        for metric in metrics:
+            spec = _fused_spec(metric)
+            res[str(metric)] = accs[spec].mean if spec in accs else _get_metric(metric, cf_exp)
+        results.append(res)
+    return results
+
+def _group_key(cf_exp: Explanation) -> tuple:
+    # Explanations with the same key can be evaluated in the same device calls.
+    return (cf_exp.pred_fn, cf_exp.cfs.shape[1:], cf_exp.ys.shape[1:], tuple(map(tuple, cf_exp.feature_indices)))
+
+# %% ../nbs/04_evaluate.ipynb 37
 def evaluate_cfs(
     cf_exp: Explanation, # CF Explanations
     metrics: Iterable[Union[str, BaseEvalMetrics]] = None, # A list of Metrics. Can be `str` or a subclass of `BaseEvalMetrics`
     return_dict: bool = True, # return a dictionary or not (default: True)
-    return_df: bool = False # return a pandas Dataframe or not (default: False)
+    return_df: bool = False, # return a pandas Dataframe or not (default: False)
+    chunk_size: int = 4096 # Number of rows evaluated at a time by the fused evaluation. If None, evaluate all rows at once.
 ):
     cf_name = cf_exp.cf_name
     data_name = cf_exp.data_name
@@ -236,9 +474,8 @@ def evaluate_cfs(
     if metrics is None:
         metrics = DEFAULT_METRICS
 
-    for metric in metrics:
-        metric_name = str(metric)
-        result_dict[(data_name, cf_name)][metric_name] = _get_metric(metric, cf_exp)
+    metrics = [_resolve_metric(metric) for metric in metrics]
+    result_dict[(data_name, cf_name)] = _evaluate_group([cf_exp], metrics, chunk_size)[0]
     result_df = pd.DataFrame.from_dict(result_dict, orient="index")
     
     if return_dict and return_df:
@@ -246,17 +483,57 @@ def evaluate_cfs(
     elif return_dict or return_df:
         return result_df if return_df else result_dict
 
+# %% ../nbs/04_evaluate.ipynb 39
+def accumulate_cfs(
+    cf_exp: Explanation, # CF Explanations
+    metrics: Iterable[Union[str, BaseEvalMetrics]] = None, # A list of Metrics which support per-instance evaluation
+    accumulators: Dict[str, MetricAccumulator] = None, # Accumulators to be updated. If None, create new accumulators.
+    chunk_size: int = 4096 # Number of rows evaluated at a time by the fused evaluation. If None, evaluate all rows at once.
+) -> Dict[str, MetricAccumulator]: # Return {metric_name: accumulator}
+    """Accumulate the per-instance metrics of `cf_exp`."""
+    if metrics is None:
+        metrics = DEFAULT_METRICS
+    accumulators = dict(accumulators or {})
 
-# %% ../nbs/04_evaluate.ipynb 33
+    metrics = [_resolve_metric(metric) for metric in metrics]
+    fused_accumulators = _evaluate_fused([cf_exp], metrics, chunk_size)[0]
+    for metric in metrics:
+        metric_name = str(metric)
+        acc = accumulators.setdefault(metric_name, MetricAccumulator())
+        spec = _fused_spec(metric)
+        if spec in fused_accumulators:
+            acc.merge(fused_accumulators[spec])
+        else:
+            acc.update(metric.per_instance(cf_exp))
+    return accumulators
+
+# %% ../nbs/04_evaluate.ipynb 41
 def benchmark_cfs(
     cf_results_list: Iterable[Explanation],
     metrics: Optional[Iterable[str]] = None,
+    n_workers: int = None, # Maximum number of groups evaluated concurrently. If None, use the default of `ThreadPoolExecutor`.
+    chunk_size: int = 4096 # Number of rows evaluated at a time by the fused evaluation. If None, evaluate all rows at once.
 ):
+    cf_results_list = list(cf_results_list)
+    if metrics is None:
+        metrics = DEFAULT_METRICS
+    metrics = [_resolve_metric(metric) for metric in metrics]
+
+    # Explanations sharing `pred_fn` and shapes are grouped into the same device calls.
+    groups = {}
+    for i, cf_exp in enumerate(cf_results_list):
+        groups.setdefault(_group_key(cf_exp), []).append(i)
+    results = [None] * len(cf_results_list)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = {
+            executor.submit(_evaluate_group, [cf_results_list[i] for i in indices], metrics, chunk_size): indices
+            for indices in groups.values()
+        }
+        for future, indices in futures.items():
+            for i, res in zip(indices, future.result()):
+                results[i] = res
     dfs = [
-        evaluate_cfs(
-            cf_exp=cf_results, metrics=metrics, return_dict=False, return_df=True
-        )
-        for cf_results in cf_results_list
+        pd.DataFrame.from_dict({(cf_exp.data_name, cf_exp.cf_name): res}, orient="index")
+        for cf_exp, res in zip(cf_results_list, results)
     ]
     return pd.concat(dfs)
-
@@ -3,18 +3,20 @@
 # %% ../nbs/03_explain.ipynb 2
 from __future__ import annotations
 from .import_essentials import *
-from .data_module import DataModule, load_data
+from .data_module import DataModule, OutOfCoreDataModule, NearestNeighborIndex, load_data, _save_npy
 from .base import *
 from .methods import *
 from .strategy import *
 from .ml_model import *
 from .utils import get_config, save_pytree, load_pytree
 import einops
+import sqlite3
+import weakref
 from sklearn.datasets import make_classification
 
 # %% auto 0
-__all__ = ['Explanation', 'fake_explanation', 'prepare_pred_fn', 'prepare_cf_module', 'prepare_rng_keys',
-           'generate_cf_explanations']
+__all__ = ['Explanation', 'fake_explanation', 'prepare_pred_fn', 'prepare_cf_module', 'prepare_rng_keys', 'CFCache',
+           'generate_cf_explanations', 'iter_cf_explanations']
 
 # %% ../nbs/03_explain.ipynb 4
 class Explanation(DataModule):
@@ -51,12 +53,13 @@ class Explanation(DataModule):
         self.pred_fn = pred_fn
         self.total_time = total_time
         self.cf_name = cf_name
+        self._data_module = data_module
         
         super().__init__(
             features=data_module.features, 
             label=data_module.label,
             config=data_module.config,
-            data=data_module.data,
+            data=data_module._data,
         )
 
     def __repr__(self):
@@ -87,6 +90,12 @@ class Explanation(DataModule):
             return einops.rearrange(self._cfs, "n d -> n () d")
         return self._cfs
     
+    @property
+    def neighbor_index(self) -> NearestNeighborIndex:
+        """Nearest neighbor index of `xs`. It is shared with `data_module`, so that it is built once for all explanations."""
+        self._neighbor_index = self._data_module.neighbor_index
+        return self._neighbor_index
+
     @property
     def data_name(self):
         return self.name
@@ -99,19 +108,30 @@ class Explanation(DataModule):
     def features_and_indices(self):
         return self.features.features_and_indices
         
-    def save(self, path: str):
+    def save(
+        self, 
+        path: str, # Path to the directory to save the explanation
+        format: Literal['csv', 'snapshot'] = 'csv' # `snapshot` saves arrays as `.npy` files, which are memory-mapped when loading
+    ):
         """Save the explanation to a directory."""
         # create directories
         dm_path = Path(path) / 'data'
         exp_path = Path(path) / 'explanations'
         exp_path.mkdir(parents=True, exist_ok=True)
         # save data module and explanations
-        super().save(dm_path)        
-        save_pytree({
-            'cfs': self.cfs,
-            'total_time': self.total_time,
-            'cf_name': self.cf_name,
-        }, exp_path)
+        super().save(dm_path, format=format)
+        if format == 'snapshot':
+            _save_npy(exp_path / 'cfs.npy', np.asarray(self._cfs))
+            save_pytree({'total_time': self.total_time, 'cf_name': self.cf_name}, exp_path)
+        else:
+            # `cfs.npy` of a previous snapshot would take precedence when loading.
+            if (exp_path / 'cfs.npy').exists():
+                (exp_path / 'cfs.npy').unlink()
+            save_pytree({
+                'cfs': self.cfs,
+                'total_time': self.total_time,
+                'cf_name': self.cf_name,
+            }, exp_path)
     
     @classmethod
     def load_from_path(cls, path: str, *, ml_module_path: str = None):
@@ -119,6 +139,8 @@ class Explanation(DataModule):
         exp_path = Path(path) / 'explanations'
         dm = DataModule.load_from_path(dm_path)
         explanations = load_pytree(exp_path)
+        if (exp_path / 'cfs.npy').exists():
+            explanations['cfs'] = np.load(exp_path / 'cfs.npy', mmap_mode='r')
         if ml_module_path is not None:
             pred_fn = MLModule.load_from_path(ml_module_path).pred_fn
         else:
@@ -130,7 +152,6 @@ class Explanation(DataModule):
             **explanations
         )
 
-
 # %% ../nbs/03_explain.ipynb 5
 def fake_explanation(n_cfs: int=1):
     dm = load_data('dummy')
@@ -147,7 +168,7 @@ def fake_explanation(n_cfs: int=1):
         data_module=dm, cfs=cfs, pred_fn=ml_model.pred_fn, total_time=0.0, cf_name='dummy_method'
     )
 
-# %% ../nbs/03_explain.ipynb 9
+# %% ../nbs/03_explain.ipynb 10
 def prepare_pred_fn(
     cf_module: CFModule,
     data: DataModule,
@@ -207,7 +228,165 @@ def prepare_rng_keys(
     return rng_keys
 
 
-# %% ../nbs/03_explain.ipynb 10
+# %% ../nbs/03_explain.ipynb 11
+def _unique_rows(
+    xs: Array, # (n, k)
+    y_targets: Array, # (n, c)
+) -> Tuple[np.ndarray, np.ndarray]: # Return indices of the first occurrence of each unique row, and the inverse indices
+    """Find unique rows of `xs` together with their `y_targets`."""
+    rows = np.concatenate([np.asarray(xs), np.asarray(y_targets, dtype=xs.dtype)], axis=1)
+    rows = np.ascontiguousarray(rows)
+    # Compare each row as a single opaque value of its raw bytes.
+    rows = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, unique_indices, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return unique_indices, inverse.ravel()
+
+# %% ../nbs/03_explain.ipynb 12
+class CFCache:
+    """On-disk cache of generated counterfactuals with size-bounded LRU eviction."""
+
+    def __init__(
+        self, 
+        path: str, # Directory of the cache
+        max_size: int = 2 ** 30, # Maximum total size (in bytes) of the cached counterfactuals
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._conn = sqlite3.connect(self.path / "cfs.sqlite")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cfs "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cfs_last_access ON cfs (last_access)")
+        # A logical clock which orders accesses for LRU eviction.
+        self._clock = self._conn.execute("SELECT COALESCE(MAX(last_access), 0) FROM cfs").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM cfs").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Total size (in bytes) of the cached counterfactuals."""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cfs").fetchone()[0]
+
+    def get_many(self, keys: List[str]) -> List[np.ndarray | None]:
+        """Look up `keys`. Return `None` for each missing key."""
+        found = {}
+        # Stay below the sqlite limit of host parameters per statement.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start: start + 500]
+            rows = self._conn.execute(
+                f"SELECT key, value FROM cfs WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(rows)
+        self._clock += 1
+        self._conn.executemany(
+            "UPDATE cfs SET last_access = ? WHERE key = ?", [(self._clock, key) for key in found]
+        )
+        self._conn.commit()
+        return [np.load(io.BytesIO(found[key])) if key in found else None for key in keys]
+
+    def put_many(self, keys: List[str], values: Iterable[np.ndarray]):
+        """Store `values` under `keys`, and evict the least recently used entries beyond `max_size`."""
+        rows = []
+        self._clock += 1
+        for key, value in zip(keys, values):
+            with io.BytesIO() as f:
+                np.save(f, np.asarray(value), allow_pickle=False)
+                blob = f.getvalue()
+            rows.append((key, blob, len(blob), self._clock))
+        self._conn.executemany("INSERT OR REPLACE INTO cfs VALUES (?, ?, ?, ?)", rows)
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        excess = self.size - self.max_size
+        if excess <= 0:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM cfs ORDER BY last_access"):
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+        self._conn.executemany("DELETE FROM cfs WHERE key = ?", evicted)
+
+    def clear(self):
+        """Remove all cached counterfactuals."""
+        self._conn.execute("DELETE FROM cfs")
+        self._conn.commit()
+
+    def close(self):
+        """Close the connection to the database."""
+        self._conn.close()
+
+    __ALL__ = ["get_many", "put_many", "size", "clear", "close"]
+
+# %% ../nbs/03_explain.ipynb 14
+def _cached_generation(
+    cache: CFCache, 
+    generate_fn: Callable, # Generate counterfactuals given `(xs, y_targets, rng_keys)`
+    fingerprint: str, # Fingerprint of the `CFModule` and `pred_fn`. See `CFModule.fingerprint`
+    xs: Array,
+    y_targets: Array,
+    rng_key: jrand.PRNGKey,
+) -> Array:
+    """Look up the counterfactuals of `xs` in `cache`, and only generate the missing ones."""
+    if rng_key is None:
+        rng_key = jrand.PRNGKey(get_config().global_seed)
+    prefix = f"{fingerprint}{np.asarray(rng_key).tobytes().hex()}".encode()
+    xs_np, y_targets_np = np.asarray(xs), np.asarray(y_targets)
+    keys = [
+        hashlib.sha256(prefix + x.tobytes() + y_target.tobytes()).hexdigest() 
+        for x, y_target in zip(xs_np, y_targets_np)
+    ]
+    cfs = cache.get_many(keys)
+    missing = np.array([i for i, cf in enumerate(cfs) if cf is None], dtype=int)
+    if len(missing) > 0:
+        # Derive the rng key of each row from its content, so that a row gets the same 
+        # counterfactual regardless of its position in the dataset.
+        row_ids = np.array([int(keys[i][:8], 16) for i in missing], dtype=np.uint32)
+        rng_keys = jax.vmap(jrand.fold_in, in_axes=(None, 0))(rng_key, row_ids)
+        cfs_missing = np.asarray(generate_fn(xs[missing], y_targets[missing], rng_keys))
+        cache.put_many([keys[i] for i in missing], cfs_missing)
+        for i, cf in zip(missing, cfs_missing):
+            cfs[i] = cf
+    return jnp.asarray(np.stack(cfs))
+
+# %% ../nbs/03_explain.ipynb 15
+def _generate_out_of_core(
+    generate_fn: Callable, # Generate counterfactuals given `(xs, y_targets, rng_keys)`
+    data: OutOfCoreDataModule,
+    pred_fn: Callable[[Array], Array],
+    rng_keys: Array,
+    cfs_path: str = None, # Path of the `.npy` file. If None, use a temporary file
+) -> np.memmap:
+    """Generate counterfactuals chunk by chunk, and write them to a memory-mapped `.npy` file. 
+    A temporary file is removed once the returned array is garbage collected.
+    """
+    n_instances, chunk_size = data.xs.shape[0], data.chunk_size
+    cfs = None
+    for start in range(0, n_instances, chunk_size):
+        xs = jnp.asarray(data.xs[start:start + chunk_size])
+        cfs_chunk = np.asarray(generate_fn(xs, 1 - pred_fn(xs), rng_keys[start:start + chunk_size]))
+        if cfs is None:
+            if cfs_path is None:
+                fd, path = tempfile.mkstemp(suffix='.npy')
+                os.close(fd)
+            else:
+                path = Path(cfs_path)
+                path.parent.mkdir(parents=True, exist_ok=True)
+            cfs = np.lib.format.open_memmap(
+                path, mode='w+', dtype=cfs_chunk.dtype, shape=(n_instances, *cfs_chunk.shape[1:])
+            )
+            if cfs_path is None:
+                weakref.finalize(cfs, os.remove, path)
+        cfs[start:start + len(cfs_chunk)] = cfs_chunk
+    cfs.flush()
+    return cfs
+
+# %% ../nbs/03_explain.ipynb 16
 def generate_cf_explanations(
     cf_module: CFModule, # CF Explanation Module
     data: DataModule, # Data Module
@@ -216,6 +395,9 @@ def generate_cf_explanations(
     train_config: Dict[str, Any] = None, 
     pred_fn_args: dict = None, # auxiliary arguments for `pred_fn` 
     rng_key: jrand.PRNGKey = None, # Random number generator key
+    deduplicate: bool = False, # Generate CFs only once for identical rows with identical targets
+    cache: CFCache | str = None, # Cache (or its directory) of CFs. Only CFs missing from the cache are generated
+    cfs_path: str = None, # Path of the `.npy` file which stores the CFs of an `OutOfCoreDataModule`. If None, use a temporary file
 ) -> Explanation: # Return counterfactual explanations.
     """Generate CF explanations."""
 
@@ -229,11 +411,45 @@ def generate_cf_explanations(
     n_instances = data.xs.shape[0]
     # Prepare random number generator keys.
     rng_keys = prepare_rng_keys(rng_key, n_instances)
-    y_targets = 1 - pred_fn(data.xs)
+    # `y_targets` of `OutOfCoreDataModule` are computed for each chunk.
+    y_targets = None if isinstance(data, OutOfCoreDataModule) else 1 - pred_fn(data.xs)
+    # A cache opened from a directory is closed after the generation.
+    owns_cache = cache is not None and not isinstance(cache, CFCache)
+    if owns_cache:
+        cache = CFCache(cache)
+    fingerprint = None if cache is None else cf_module.fingerprint(pred_fn)
+    if cache is not None and fingerprint is None:
+        warnings.warn(
+            "Cannot identify the weights behind `pred_fn` or the constraints functions; "
+            "generating CFs without the cache."
+        )
     
     # Generate CF explanations.
+    def generate_fn(xs, y_targets, rng_keys):
+        if deduplicate:
+            # Each unique row uses the rng key of its first occurrence.
+            unique_indices, inverse = _unique_rows(xs, y_targets)
+            cfs = strategy(
+                cf_module.generate_cf, xs[unique_indices], pred_fn, 
+                y_targets[unique_indices], rng_keys[unique_indices]
+            )
+            return cfs[inverse]
+        return strategy(cf_module.generate_cf, xs, pred_fn, y_targets, rng_keys)
+    
+    def generate_or_lookup_fn(xs, y_targets, rng_keys):
+        if fingerprint is not None:
+            return _cached_generation(cache, generate_fn, fingerprint, xs, y_targets, rng_key)
+        return generate_fn(xs, y_targets, rng_keys)
+
     start_time = time.time()
-    cfs = strategy(cf_module.generate_cf, data.xs, pred_fn, y_targets, rng_keys)
+    try:
+        if isinstance(data, OutOfCoreDataModule):
+            cfs = _generate_out_of_core(generate_or_lookup_fn, data, pred_fn, rng_keys, cfs_path)
+        else:
+            cfs = generate_or_lookup_fn(data.xs, y_targets, rng_keys)
+    finally:
+        if owns_cache:
+            cache.close()
     # cfs = jax.vmap(cf_module.generate_cf, in_axes=(0, None, 0, 0))(data.xs, pred_fn, y_targets, rng_keys)
     total_time = time.time() - start_time
 
@@ -245,3 +461,33 @@ def generate_cf_explanations(
         total_time=total_time,
         pred_fn=pred_fn,
     )
+
+# %% ../nbs/03_explain.ipynb 17
+def iter_cf_explanations(
+    cf_module: CFModule, # CF Explanation Module
+    data: DataModule, # Data Module
+    pred_fn: Callable[[Array, ...], Array] = None, # Predictive function
+    strategy: str | BaseStrategy = None, # Parallelism Strategy for generating CFs in each chunk. Default to `vmap`.
+    chunk_size: int = 1024, # Number of instances in each chunk
+    train_config: Dict[str, Any] = None, 
+    pred_fn_args: dict = None, # auxiliary arguments for `pred_fn` 
+    rng_key: jrand.PRNGKey = None, # Random number generator key
+) -> Iterable[Tuple[Array, Array]]: # Yield `(indices, cfs)` for each chunk.
+    """Generate CF explanations chunk by chunk. 
+    Unlike `generate_cf_explanations`, the predictions and counterfactuals are only 
+    computed for one chunk at a time, so the peak memory depends on `chunk_size`.
+    """
+
+    # Prepare `pred_fn`, `cf_module`, and `strategy`.
+    pred_fn = prepare_pred_fn(cf_module, data, pred_fn, pred_fn_args)
+    cf_module = prepare_cf_module(cf_module, data, pred_fn, train_config)
+    if strategy is None:
+        strategy = StrategyFactory.get_default_strategy()
+    strategy = StreamingStrategy(chunk_size, strategy)
+    # Prepare random number generator keys for all instances, 
+    # so that the results are consistent with `generate_cf_explanations`.
+    rng_keys = prepare_rng_keys(rng_key, data.xs.shape[0])
+    # `y_targets` are computed lazily for each chunk.
+    yield from strategy.iter_chunks(
+        cf_module.generate_cf, data.xs, pred_fn, y_targets=None, rng_keys=rng_keys
+    )
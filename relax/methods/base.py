@@ -6,6 +6,9 @@ __all__ = ['CFModule', 'ParametricCFModule']
 # %% ../../nbs/methods/00_base.ipynb 2
 from ..import_essentials import *
 from ..base import BaseConfig, BaseModule, PredFnMixedin, TrainableMixedin
+from ..strategy import BaseStrategy, StrategyFactory, _lru_get
+from ..utils import _concat_states, _module_state, _fn_state, _hash_state
+from jax.experimental.serialize_executable import serialize, deserialize_and_load
 
 # %% ../../nbs/methods/00_base.ipynb 3
 def default_apply_constraints_fn(x, cf, hard, **kwargs):
@@ -15,6 +18,17 @@ def default_compute_reg_loss_fn(x, cf, **kwargs):
     return 0.
 
 # %% ../../nbs/methods/00_base.ipynb 4
+_COMPILED_CF_CACHE = collections.OrderedDict()
+
+def _strategy_state(strategy) -> list:
+    """Describe the public attributes of `strategy`."""
+    state = [type(strategy).__name__]
+    for name, attr in sorted(vars(strategy).items()):
+        if not name.startswith('_'):
+            state += [name] + (_strategy_state(attr) if isinstance(attr, BaseStrategy) else [attr])
+    return state
+
+# %% ../../nbs/methods/00_base.ipynb 5
 class CFModule(BaseModule):
     """Base class for all counterfactual modules."""
 
@@ -65,6 +79,78 @@ class CFModule(BaseModule):
         **kwargs
     ) -> Array: # Return counterfactual of x.
         raise NotImplementedError
+
+    def fingerprint(
+        self, 
+        pred_fn: Callable = None, # Predictive function. Should be a bound method of a module (e.g., `MLModule.pred_fn`)
+    ) -> str | None: # Return `None` if the weights behind `pred_fn` or the constraints functions cannot be identified
+        """Hash the config and weights of this module, `pred_fn` and the constraints functions."""
+        state = _concat_states(
+            [[type(self).__name__, self.config.json()], _module_state(self)] + 
+            [_fn_state(fn) for fn in (pred_fn, self._apply_constraints_fn, self._compute_reg_loss_fn)]
+        )
+        return None if state is None else _hash_state(state)
+
+    def _compile_cache_key(
+        self, feature_dim: int, batch_size: int, pred_fn: Callable, strategy: BaseStrategy
+    ) -> str | None:
+        fingerprint = self.fingerprint(pred_fn)
+        if fingerprint is None:
+            return None
+        device = jax.devices()[0]
+        return _hash_state([
+            fingerprint, feature_dim, batch_size, jax.__version__, device.platform, device.device_kind,
+        ] + _strategy_state(strategy))
+
+    def compile(
+        self,
+        feature_dim: int, # The number of (transformed) features
+        batch_size: int, # The number of instances per call
+        pred_fn: Callable, # Predictive function. Should be a bound method of a module (e.g., `MLModule.pred_fn`)
+        strategy: str | BaseStrategy = 'vmap', # Parallelism strategy. Must be traceable by `jax.jit`
+        cache_dir: str = None, # Directory for the serialized executables. If None, only cache in memory
+    ) -> jax.stages.Compiled: # Compiled generator called with `(xs, y_targets, rng_keys)`
+        """Ahead-of-time compile the strategy-wrapped `generate_cf` for fixed input shapes."""
+        strategy = StrategyFactory.get_strategy(strategy)
+        key = self._compile_cache_key(feature_dim, batch_size, pred_fn, strategy)
+        if key is None:
+            warnings.warn(
+                "Cannot identify the weights behind `pred_fn` or the constraints functions; "
+                "the compiled generator will not be cached."
+            )
+        path = Path(cache_dir) / f"{key}.pkl" if cache_dir is not None and key is not None else None
+
+        def load_or_compile() -> jax.stages.Compiled:
+            if path is not None and path.exists():
+                try:
+                    with open(path, "rb") as f:
+                        return deserialize_and_load(*pickle.load(f))
+                except Exception as e:
+                    warnings.warn(f"Failed to load the cached executable from `{path}`; recompiling. ({e})")
+
+            xs = jax.ShapeDtypeStruct((batch_size, feature_dim), jnp.float32)
+            y_targets = jax.eval_shape(pred_fn, xs)
+            rng_keys = jax.eval_shape(lambda: jrand.split(jrand.PRNGKey(0), batch_size))
+            compiled = jax.jit(
+                lambda xs, y_targets, rng_keys: strategy(self.generate_cf, xs, pred_fn, y_targets, rng_keys)
+            ).lower(xs, y_targets, rng_keys).compile()
+
+            if path is not None:
+                try:
+                    payload = pickle.dumps(serialize(compiled))
+                except Exception as e:
+                    warnings.warn(
+                        "The compiled generator cannot be serialized on this backend; "
+                        f"it is only cached in memory. ({e})"
+                    )
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(path, "wb") as f:
+                        f.write(payload)
+            return compiled
+
+        # Compiled generators in memory are bounded by an LRU cache.
+        return _lru_get(_COMPILED_CF_CACHE, key, load_or_compile)
     
     __ALL__ = [
         "set_apply_constraints_fn",
@@ -74,10 +160,12 @@ class CFModule(BaseModule):
         "save",
         "load_from_path",
         "before_generate_cf",
-        "generate_cf"
+        "generate_cf",
+        "fingerprint",
+        "compile"
     ]
 
-# %% ../../nbs/methods/00_base.ipynb 5
+# %% ../../nbs/methods/00_base.ipynb 7
 class ParametricCFModule(CFModule, TrainableMixedin):
     """Base class for parametric counterfactual modules."""
     
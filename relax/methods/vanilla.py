@@ -4,13 +4,36 @@
 from __future__ import annotations
 from ..import_essentials import *
 from .base import CFModule
-from ..base import BaseConfig
+from ..base import BaseConfig, StepwiseMixedin
 from ..utils import auto_reshaping, grad_update, validate_configs
 
 # %% auto 0
 __all__ = ['VanillaCFConfig', 'VanillaCF']
 
 # %% ../../nbs/methods/01_vanilla.ipynb 5
+def _vanilla_cf_step(
+    cf_opt_state: Tuple[Array, optax.OptState], # `(cf, opt_state)` of the previous step
+    x: Array,  # `x` shape: (1, k), where `k` is the number of features
+    y_target: Array, # `y_target` shape: (1,)
+    pred_fn: Callable[[Array], Array],  # y = pred_fn(x)
+    lr: float,  # learning rate for each `cf` optimization step
+    lambda_: float,  #  loss = validity_loss + lambda_params * cost
+    validity_fn: Callable,
+    cost_fn: Callable,
+    apply_constraints_fn: Callable
+) -> Tuple[Array, optax.OptState]: # return updated `(cf, opt_state)`
+    """Run one optimization step of `cf`."""
+
+    def loss_fn(cf: Array):
+        cf_y_pred = pred_fn(cf)
+        return validity_fn(y_target, cf_y_pred).mean() + lambda_ * cost_fn(cf, x).mean()
+
+    cf, opt_state = cf_opt_state
+    cf_grads = jax.grad(loss_fn)(cf)
+    cf, opt_state = grad_update(cf_grads, cf, opt_state, optax.rmsprop(lr))
+    cf = apply_constraints_fn(x, cf, hard=False)
+    return cf, opt_state
+
 @ft.partial(jit, static_argnums=(2, 3, 6, 7, 8))
 def _vanilla_cf(
     x: jnp.DeviceArray,  # `x` shape: (k,), where `k` is the number of features
@@ -23,50 +46,53 @@ def _vanilla_cf(
     cost_fn: Callable,
     apply_constraints_fn: Callable
 ) -> jnp.DeviceArray:  # return `cf` shape: (k,)
-    @jit
-    def loss_fn_1(y_true: Array, y_pred: Array):
-        return validity_fn(y_true, y_pred).mean()
-
-    @jit
-    def loss_fn_2(x: Array, cf: Array):
-        return cost_fn(cf, x).mean()
-
-    @partial(jit, static_argnums=(2,))
-    def loss_fn(
-        cf: Array,  # `cf` shape: (k, 1)
-        x: Array,  # `x` shape: (k, 1)
-        pred_fn: Callable[[Array], Array],
-    ):
-        cf_y_pred = pred_fn(cf)
-        return loss_fn_1(y_target, cf_y_pred) + lambda_ * loss_fn_2(x, cf)
-
     @loop_tqdm(n_steps)
     def gen_cf_step(
         i, cf_opt_state: Tuple[Array, optax.OptState] #x: Array, cf: Array, opt_state: optax.OptState
     ) -> Tuple[jnp.DeviceArray, optax.OptState]:
-        cf, opt_state = cf_opt_state
-        cf_grads = jax.grad(loss_fn)(cf, x, pred_fn)
-        cf, opt_state = grad_update(cf_grads, cf, opt_state, opt)
-        cf = apply_constraints_fn(x, cf, hard=False)
-        return cf, opt_state
+        return _vanilla_cf_step(
+            cf_opt_state, x, y_target, pred_fn, lr, lambda_, validity_fn, cost_fn, apply_constraints_fn
+        )
 
     cf = jnp.array(x, copy=True)
-    opt = optax.rmsprop(lr)
-    opt_state = opt.init(cf)
+    opt_state = optax.rmsprop(lr).init(cf)
     cf, opt_state = lax.fori_loop(0, n_steps, gen_cf_step, (cf, opt_state))
 
     cf = apply_constraints_fn(x, cf, hard=True)
     return cf
 
 # %% ../../nbs/methods/01_vanilla.ipynb 6
+@ft.partial(jit, static_argnums=(3, 7, 8, 9))
+def _vanilla_cf_steps(
+    cf_opt_state: Tuple[Array, optax.OptState], # `(cf, opt_state)` of the previous step
+    x: Array,  # `x` shape: (1, k), where `k` is the number of features
+    y_target: Array, # `y_target` shape: (1,)
+    pred_fn: Callable[[Array], Array],  # y = pred_fn(x)
+    n_steps: int, # Number of steps to run. It can be a traced value.
+    lr: float,  # learning rate for each `cf` optimization step
+    lambda_: float,  #  loss = validity_loss + lambda_params * cost
+    validity_fn: Callable,
+    cost_fn: Callable,
+    apply_constraints_fn: Callable
+) -> Tuple[Array, optax.OptState]: # return updated `(cf, opt_state)`
+    """Run `n_steps` optimization steps of `_vanilla_cf` from `cf_opt_state`."""
+
+    def gen_cf_step(i, cf_opt_state: Tuple[Array, optax.OptState]):
+        return _vanilla_cf_step(
+            cf_opt_state, x, y_target, pred_fn, lr, lambda_, validity_fn, cost_fn, apply_constraints_fn
+        )
+
+    return lax.fori_loop(0, n_steps, gen_cf_step, cf_opt_state)
+
+# %% ../../nbs/methods/01_vanilla.ipynb 7
 class VanillaCFConfig(BaseConfig):
     n_steps: int = 100
     lr: float = 0.1
     lambda_: float = 0.1
     validity_fn: str = 'KLDivergence'
 
-# %% ../../nbs/methods/01_vanilla.ipynb 7
-class VanillaCF(CFModule):
+# %% ../../nbs/methods/01_vanilla.ipynb 8
+class VanillaCF(CFModule, StepwiseMixedin):
 
     def __init__(
         self,
@@ -113,3 +139,46 @@ class VanillaCF(CFModule):
             apply_constraints_fn=self.apply_constraints,
         )
 
+    def init_cf_state(
+        self, 
+        x: Array, # `x` shape: (k,), where `k` is the number of features
+        pred_fn: Callable[[Array], Array] = None,
+        y_target: Array = None,
+        rng_key: jrand.PRNGKey = None,
+        **kwargs
+    ) -> Tuple[Array, optax.OptState]:
+        cf = jnp.array(x, copy=True).reshape(1, -1)
+        opt_state = optax.rmsprop(self.config.lr).init(cf)
+        return cf, opt_state
+    
+    def update_cf_state(
+        self,
+        state: Tuple[Array, optax.OptState],
+        x: Array, # `x` shape: (k,), where `k` is the number of features
+        pred_fn: Callable[[Array], Array],
+        y_target: Array,
+        n_steps: int,
+        **kwargs
+    ) -> Tuple[Array, optax.OptState]:
+        return _vanilla_cf_steps(
+            state,
+            x=x.reshape(1, -1),
+            y_target=jnp.array(y_target, copy=True),
+            pred_fn=pred_fn,
+            n_steps=n_steps,
+            lr=self.config.lr,
+            lambda_=self.config.lambda_,
+            validity_fn=keras.losses.get({'class_name': self.config.validity_fn, 'config': {'reduction': None}}),
+            cost_fn=keras.losses.get({'class_name': 'MeanSquaredError', 'config': {'reduction': None}}),
+            apply_constraints_fn=self.apply_constraints,
+        )
+    
+    def cf_from_state(
+        self, 
+        state: Tuple[Array, optax.OptState],
+        x: Array, # `x` shape: (k,), where `k` is the number of features
+        **kwargs
+    ) -> Array:
+        cf, _ = state
+        cf = self.apply_constraints(x.reshape(1, -1), cf, hard=True)
+        return cf.reshape(x.shape)
@@ -5,8 +5,8 @@ __all__ = ['MLPBlock', 'MLP', 'MLModuleConfig', 'MLModule', 'download_ml_module'
 
 # %% ../nbs/02_ml_model.ipynb 1
 from .import_essentials import *
-from .data_module import DataModule, DEFAULT_DATA_CONFIGS
-from .utils import validate_configs
+from .data_module import DataModule, OutOfCoreDataModule, DEFAULT_DATA_CONFIGS
+from .utils import validate_configs, get_config
 from .base import *
 from sklearn.datasets import make_classification
 from sklearn.model_selection import train_test_split
@@ -91,6 +91,29 @@ class MLModuleConfig(BaseConfig):
 
 
 # %% ../nbs/02_ml_model.ipynb 5
+class _OutOfCoreDataset(keras.utils.PyDataset):
+    """Read batches of the training data from a memory-mapped `OutOfCoreDataModule`."""
+
+    def __init__(self, data: OutOfCoreDataModule, batch_size: int):
+        super().__init__()
+        self.data = data
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(get_config().global_seed)
+        # Copy the indices, as they are shuffled in place at the end of each epoch.
+        self.indices = np.array(data.config.train_indices, copy=True)
+
+    def __len__(self):
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __getitem__(self, idx):
+        # Sorted indices result in sequential reads from the disk.
+        indices = np.sort(self.indices[idx * self.batch_size: (idx + 1) * self.batch_size])
+        return self.data.xs[indices], self.data.ys[indices]
+
+    def on_epoch_end(self):
+        self.rng.shuffle(self.indices)
+
+# %% ../nbs/02_ml_model.ipynb 7
 class MLModule(BaseModule, TrainableMixedin, PredFnMixedin):
     def __init__(self, config: MLModuleConfig = None, *, model: keras.Model = None, name: str = None):
         if config is None:
@@ -124,7 +147,11 @@ class MLModule(BaseModule, TrainableMixedin, PredFnMixedin):
         epochs: int = 10,
         **fit_kwargs
     ):
-        if isinstance(data, DataModule):
+        if isinstance(data, OutOfCoreDataModule):
+            # Batches are read from the disk, so that the training data are never fully loaded.
+            X_train, y_train = _OutOfCoreDataset(data, batch_size), None
+            batch_size = None
+        elif isinstance(data, DataModule):
             X_train, y_train = data['train']
         else:
             X_train, y_train = data
@@ -165,7 +192,7 @@ class MLModule(BaseModule, TrainableMixedin, PredFnMixedin):
             raise ValueError("Model is not trained.")
         return self.model(x, training=False)
 
-# %% ../nbs/02_ml_model.ipynb 16
+# %% ../nbs/02_ml_model.ipynb 18
 def download_ml_module(name: str, path: str = None):
     if path is None:
         path = Path('relax-assets') / name / 'model'
@@ -192,7 +219,7 @@ def load_ml_module(name: str) -> MLModule:
     download_ml_module(name)
     return MLModule.load_from_path(f"relax-assets/{name}/model")
 
-# %% ../nbs/02_ml_model.ipynb 19
+# %% ../nbs/02_ml_model.ipynb 21
 class AutoEncoder(keras.Model):
     def __init__(
         self,
@@ -0,0 +1,159 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03_explain.serve.ipynb.
+
+# %% ../nbs/03_explain.serve.ipynb 2
+from __future__ import annotations
+from .import_essentials import *
+from .methods.base import CFModule
+from .strategy import BaseStrategy
+from .utils import get_config
+import asyncio
+
+# %% auto 0
+__all__ = ['ExplanationServer']
+
+# %% ../nbs/03_explain.serve.ipynb 4
+class ExplanationServer:
+    """Queue single-instance requests, and generate their counterfactuals in padded batches 
+    via a pre-compiled strategy. A batch is flushed once it is full or its oldest request 
+    has waited for `max_latency` seconds.
+    """
+
+    def __init__(
+        self,
+        cf_module: CFModule, # CF Explanation Module. It should be prepared (e.g., trained and hooked up with the data module)
+        pred_fn: Callable[[Array], Array], # Predictive function
+        feature_dim: int, # The number of (transformed) features
+        max_batch_size: int = 64, # Maximum number of requests per batch
+        max_latency: float = 0.01, # Maximum time (in seconds) a request waits for its batch to fill
+        strategy: str | BaseStrategy = 'vmap', # Parallelism strategy. Must be traceable by `jax.jit`
+        rng_key: jrand.PRNGKey = None, # Random number generator key
+        cache_dir: str = None, # Directory of the compiled generator (see `CFModule.compile`)
+    ):
+        if max_batch_size <= 0:
+            raise ValueError(f"`max_batch_size` must be positive, but got max_batch_size={max_batch_size}.")
+        if max_latency < 0:
+            raise ValueError(f"`max_latency` must be non-negative, but got max_latency={max_latency}.")
+        self.cf_module = cf_module
+        self.pred_fn = pred_fn
+        self.feature_dim = feature_dim
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.strategy = strategy
+        self.cache_dir = cache_dir
+        self.rng_key = rng_key if rng_key is not None else jrand.PRNGKey(get_config().global_seed)
+        self._generate_fn = None
+        self._queue = None
+        self._task = None
+        self._batch = []
+        self._n_requests = 0
+        self._n_batches = 0
+        self._n_filled = 0
+
+    async def start(self):
+        """Compile the generator and start serving requests."""
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._generate_fn = await loop.run_in_executor(None, lambda: self.cf_module.compile(
+            self.feature_dim, self.max_batch_size, self.pred_fn, self.strategy, self.cache_dir
+        ))
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._serve())
+
+    async def stop(self):
+        """Stop serving requests. Pending requests, including those of the in-flight batch, are cancelled."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        for _, _, future in self._batch:
+            future.cancel()
+        self._batch = []
+        while not self._queue.empty():
+            self._queue.get_nowait()[-1].cancel()
+        self._task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    async def explain(
+        self, 
+        x: Array, # A single instance of shape `(feature_dim,)`
+        y_target: Array = None, # Target of `x`. If None, flip the prediction of `x`
+    ) -> Array: # Return the counterfactual of `x`
+        """Queue `x`, and wait for its counterfactual."""
+        if self._task is None:
+            raise ValueError("The server is not started. Call `await server.start()` first.")
+        x = np.asarray(x, dtype=np.float32).reshape(self.feature_dim)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((x, y_target, future))
+        return await future
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        """Serving metrics: the current queue depth, the number of served requests and batches, 
+        and the average fraction of each batch filled with requests.
+        """
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "n_requests": self._n_requests,
+            "n_batches": self._n_batches,
+            "batch_fill": self._n_filled / (self._n_batches * self.max_batch_size) if self._n_batches else 0.,
+        }
+
+    async def _next_batch(self) -> list:
+        # Requests taken off the queue are kept in `self._batch`, so that `stop` can cancel them.
+        self._batch = batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _generate(self, batch: list, rng_keys: Array) -> np.ndarray:
+        n_requests = len(batch)
+        xs = np.stack([x for x, _, _ in batch])
+        # Pad the batch to the compiled batch size by repeating the last request.
+        xs = np.concatenate([xs, np.repeat(xs[-1:], self.max_batch_size - n_requests, axis=0)])
+        y_targets = np.array(1 - self.pred_fn(xs))
+        for i, (_, y_target, _) in enumerate(batch):
+            if y_target is not None:
+                y_targets[i] = y_target
+        cfs = self._generate_fn(xs, y_targets, rng_keys)
+        return np.asarray(cfs)[:n_requests]
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            # Each request gets its own rng key, independent of its batch.
+            request_ids = jnp.arange(self._n_requests, self._n_requests + self.max_batch_size)
+            rng_keys = jax.vmap(jrand.fold_in, in_axes=(None, 0))(self.rng_key, request_ids)
+            self._n_requests += len(batch)
+            self._n_batches += 1
+            self._n_filled += len(batch)
+            try:
+                cfs = await loop.run_in_executor(None, self._generate, batch, rng_keys)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, _, future), cf in zip(batch, cfs):
+                    if not future.done():
+                        future.set_result(cf)
+            self._batch = []
+
+    __ALL__ = ["start", "stop", "explain", "metrics"]
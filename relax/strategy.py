@@ -3,11 +3,15 @@
 # %% ../nbs/03_explain.strategy.ipynb 2
 from __future__ import annotations
 from .import_essentials import *
+from .base import StepwiseMixedin
+from .utils import get_config, _fns_fingerprint
 import einops
+from jax.sharding import Mesh, NamedSharding, PartitionSpec
 
 # %% auto 0
-__all__ = ['BaseStrategy', 'IterativeStrategy', 'VmapStrategy', 'PmapStrategy', 'BatchedVmapStrategy', 'BatchedPmapStrategy',
-           'StrategyFactory']
+__all__ = ['BaseStrategy', 'IterativeStrategy', 'VmapStrategy', 'ScanStrategy', 'PmapStrategy', 'BatchedVmapStrategy',
+           'BatchedPmapStrategy', 'ShardedStrategy', 'EarlyExitStrategy', 'ProcessPoolStrategy', 'AutoStrategy',
+           'StrategyFactory', 'StreamingStrategy', 'BucketedStrategy', 'PipelinedBatchedStrategy']
 
 # %% ../nbs/03_explain.strategy.ipynb 3
 class BaseStrategy:
@@ -70,6 +74,76 @@ class VmapStrategy(BaseStrategy):
 
 
 # %% ../nbs/03_explain.strategy.ipynb 6
+_MAX_CACHED_FNS = 32 # Maximum number of jitted functions kept by each strategy
+
+def _lru_get(
+    cache: collections.OrderedDict, # Least-recently-used cache
+    key: typing.Hashable, # Cache key. It should hold the functions themselves rather than their names, so that distinct closures do not collide. If None, nothing is cached
+    make_value: Callable[[], Any], # Build the value on a cache miss
+    maxsize: int = _MAX_CACHED_FNS, # The least recently used entry is evicted when the cache exceeds `maxsize`
+):
+    """Look up `key` in `cache`, or build and insert its value."""
+    try:
+        hash(key)
+    except TypeError:
+        # Unhashable keys cannot be cached.
+        return make_value()
+    if key is None:
+        return make_value()
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = cache[key] = make_value()
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+    return value
+
+def _jit_cache_key(fn: Callable, pred_fn: Callable, **kwargs) -> tuple | None:
+    """Key of a jitted function closing over `fn`, `pred_fn` and `kwargs`, or `None` if it should not be cached.
+    Weights and configs are baked into the compiled program, so the key includes their fingerprint.
+    """
+    fingerprint = _fns_fingerprint(fn, pred_fn, **kwargs)
+    if fingerprint is None:
+        return None
+    return (fn, pred_fn, tuple(sorted(kwargs.items())), fingerprint)
+
+# %% ../nbs/03_explain.strategy.ipynb 7
+class ScanStrategy(BaseStrategy):
+    """Generate counterfactuals one instance at a time via a single jitted `lax.map`.
+    It has the memory profile of `IterativeStrategy` without its per-instance Python overhead.
+    """
+
+    def __init__(self):
+        self._jitted_fns = collections.OrderedDict()
+
+    def _get_jitted_fn(self, fn: Callable, pred_fn: Callable, **kwargs) -> Callable:
+        def partial_fn(state):
+            x, y_target, rng_key = state
+            return fn(x, pred_fn=pred_fn, y_target=y_target, rng_key=rng_key, **kwargs)
+
+        key = _jit_cache_key(fn, pred_fn, **kwargs)
+        return _lru_get(
+            self._jitted_fns, key, 
+            lambda: jax.jit(lambda xs, y_targets, rng_keys: lax.map(partial_fn, (xs, y_targets, rng_keys)))
+        )
+
+    def __call__(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> Array: # Generated counterfactual explanations
+        
+        assert xs.ndim == 2
+        cfs = self._get_jitted_fn(fn, pred_fn, **kwargs)(xs, y_targets, rng_keys)
+        return cfs
+    
+    __ALL__ = ["__call__"]
+
+# %% ../nbs/03_explain.strategy.ipynb 8
 def _pad_divisible_X(
     xs: Array,
     n_devices: int
@@ -84,8 +158,20 @@ def _pad_divisible_X(
     X_padded = xs.reshape(n_devices, -1, *xs.shape[1:])
     return X_padded
 
+def _pad_rows_to(
+    xs: Array,
+    size: int
+):
+    """Pad `xs` along the first axis to `size` rows by repeating the last row."""
+    pad_size = size - xs.shape[0]
+    if pad_size > 0:
+        xs_pad = einops.repeat(
+            xs[-1:], "n ... -> (pad n) ...", pad=pad_size
+        )
+        xs = jnp.concatenate([xs, xs_pad])
+    return xs
 
-# %% ../nbs/03_explain.strategy.ipynb 8
+# %% ../nbs/03_explain.strategy.ipynb 10
 class PmapStrategy(BaseStrategy):
     def __init__(
         self, 
@@ -119,7 +205,7 @@ class PmapStrategy(BaseStrategy):
         return cfs
 
 
-# %% ../nbs/03_explain.strategy.ipynb 9
+# %% ../nbs/03_explain.strategy.ipynb 11
 def _pad_xs(
     xs: Array, pad_size: int, batch_size: int
 ):
@@ -162,11 +248,100 @@ def _batched_generation(
     cfs = cfs[:x_shape[0]]
     return cfs
 
-# %% ../nbs/03_explain.strategy.ipynb 10
+# %% ../nbs/03_explain.strategy.ipynb 12
+_BATCH_SIZE_CACHE = collections.OrderedDict()
+_MAX_AUTO_BATCH_SIZE = 2 ** 24
+
+def _fn_identifier(fn: Callable):
+    """Identify `fn` by the config of its `CFModule` (if any), or by `fn` itself."""
+    module = getattr(fn, '__self__', None)
+    config = getattr(module, 'config', None)
+    if isinstance(config, BaseParser):
+        return (type(module).__name__, config.json())
+    # Closures share their name, so they are identified by the function object.
+    return fn
+
+def _available_memory_in_bytes(device) -> int:
+    """Return the available memory of `device`. Use the host memory if the device does not report it."""
+    try:
+        stats = device.memory_stats()
+    except Exception:
+        stats = None
+    if stats and 'bytes_limit' in stats:
+        return stats['bytes_limit'] - stats.get('bytes_in_use', 0)
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, AttributeError, OSError):
+        raise ValueError("Cannot determine the available memory. Please specify `batch_size` explicitly.")
+
+def _compiled_memory_in_bytes(compiled) -> int:
+    """Estimate the peak memory of a compiled program."""
+    stats = compiled.memory_analysis()
+    size = 0
+    if stats is not None:
+        size = (stats.argument_size_in_bytes + stats.output_size_in_bytes 
+                + stats.temp_size_in_bytes - stats.alias_size_in_bytes)
+    if size <= 0:
+        # Some backends (e.g., CPU) do not report memory statistics.
+        # Fall back to the number of bytes accessed by the program.
+        cost = compiled.cost_analysis()
+        cost = cost[0] if isinstance(cost, list) else cost
+        size = cost.get('bytes accessed', 0.) if cost else 0.
+    return int(size)
+
+def _tune_batch_size(
+    fn: Callable, # Function to generate cf for a single input
+    xs: Array, # Input instances to be explained
+    pred_fn: Callable[[Array], Array],
+    y_targets: Array,
+    rng_keys: Iterable[jrand.PRNGKey],
+    memory_fraction: float = 0.5, # Fraction of the available memory to use
+    **kwargs
+) -> int: # The largest batch size that fits in memory
+    """Find the largest power-of-two batch size whose compiled program fits in memory."""
+
+    def partial_fn(x, y_target, rng_key):
+        return fn(x, pred_fn=pred_fn, y_target=y_target, rng_key=rng_key, **kwargs)
+    
+    def memory_of(batch_size: int) -> int:
+        shapes = [
+            jax.ShapeDtypeStruct((batch_size, *arr.shape[1:]), arr.dtype) 
+            for arr in (xs, y_targets, rng_keys)
+        ]
+        compiled = jax.jit(jax.vmap(partial_fn)).lower(*shapes).compile()
+        return _compiled_memory_in_bytes(compiled)
+
+    def tune() -> int:
+        budget = memory_fraction * _available_memory_in_bytes(device)
+        # The memory grows (roughly) linearly with the batch size.
+        # Fit it with two small probes, and extrapolate the batch size.
+        small, large = 128, 256
+        mem_small, mem_large = memory_of(small), memory_of(large)
+        per_instance = max((mem_large - mem_small) / (large - small), 1.)
+        fixed = max(mem_small - per_instance * small, 0.)
+        batch_size = max(int((budget - fixed) / per_instance), 1)
+        batch_size = min(2 ** int(math.log2(batch_size)), _MAX_AUTO_BATCH_SIZE)
+        # Verify the candidate, and halve it until the compiled program fits.
+        while batch_size > 1 and memory_of(batch_size) > budget:
+            batch_size //= 2
+        return batch_size
+
+    device = jax.devices()[0]
+    key = (_fn_identifier(fn), xs.shape[1:], device.device_kind, memory_fraction)
+    return _lru_get(_BATCH_SIZE_CACHE, key, tune)
+
+# %% ../nbs/03_explain.strategy.ipynb 13
 class BatchedVmapStrategy(BaseStrategy):
     """Auto-batching for generate counterfactuals via `jax.vmap`."""
-    def __init__(self, batch_size: int):
+    def __init__(
+        self, 
+        batch_size: int | Literal['auto'], # Batch size. If 'auto', tune it based on the available memory
+        memory_fraction: float = 0.5, # Fraction of the available memory to use when `batch_size='auto'`
+    ):
+        if batch_size != 'auto' and not isinstance(batch_size, int):
+            raise ValueError(f"`batch_size` should be an integer or 'auto', but got batch_size={batch_size}.")
         self.batch_size = batch_size
+        self.memory_fraction = memory_fraction
 
     def __call__(
         self, 
@@ -177,14 +352,18 @@ class BatchedVmapStrategy(BaseStrategy):
         rng_keys: Iterable[jrand.PRNGKey],
         **kwargs
     ) -> Array: # Generated counterfactual explanations
+        batch_size = self.batch_size
+        if batch_size == 'auto':
+            batch_size = _tune_batch_size(
+                fn, xs, pred_fn, y_targets, rng_keys, self.memory_fraction, **kwargs
+            )
         vmap_g = VmapStrategy()    
         cfs = _batched_generation(
-            vmap_g, fn, xs, pred_fn, y_targets, rng_keys, self.batch_size, **kwargs
+            vmap_g, fn, xs, pred_fn, y_targets, rng_keys, batch_size, **kwargs
         )
         return cfs
 
-
-# %% ../nbs/03_explain.strategy.ipynb 11
+# %% ../nbs/03_explain.strategy.ipynb 14
 class BatchedPmapStrategy(BaseStrategy):
     """Auto-batching for generate counterfactuals via `jax.vmap`."""
     def __init__(self, batch_size: int, n_devices: int = None):
@@ -207,7 +386,417 @@ class BatchedPmapStrategy(BaseStrategy):
         return cfs
 
 
-# %% ../nbs/03_explain.strategy.ipynb 22
+# %% ../nbs/03_explain.strategy.ipynb 15
+class ShardedStrategy(BaseStrategy):
+    """Generate counterfactuals via `jax.jit` with inputs sharded over a device mesh."""
+
+    def __init__(
+        self, 
+        n_devices: int = None, # Number of devices. If None, use all available devices
+    ):
+        self.n_devices = n_devices or jax.device_count()
+        mesh = Mesh(np.array(jax.devices()[:self.n_devices]), axis_names=('batch',))
+        self._sharding = NamedSharding(mesh, PartitionSpec('batch'))
+        self._jitted_fns = collections.OrderedDict()
+
+    def _get_jitted_fn(self, fn: Callable, pred_fn: Callable, **kwargs) -> Callable:
+        def partial_fn(x, y_target, rng_key):
+            return fn(x, pred_fn=pred_fn, y_target=y_target, rng_key=rng_key, **kwargs)
+        
+        key = _jit_cache_key(fn, pred_fn, **kwargs)
+        return _lru_get(self._jitted_fns, key, lambda: jax.jit(
+            jax.vmap(partial_fn), in_shardings=self._sharding, out_shardings=self._sharding
+        ))
+
+    def __call__(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> Array: # Generated counterfactual explanations
+        
+        assert xs.ndim == 2
+        n_instances = xs.shape[0]
+        # Pad the inputs to be divisible by `n_devices`. Each device receives a contiguous block of rows.
+        n_padded = -(-n_instances // self.n_devices) * self.n_devices
+        xs, y_targets, rng_keys = jax.device_put([
+            _pad_rows_to(arr, n_padded) for arr in (xs, y_targets, rng_keys)
+        ], self._sharding)
+        cfs = self._get_jitted_fn(fn, pred_fn, **kwargs)(xs, y_targets, rng_keys)
+        # `cfs` stays sharded across devices unless padded rows need to be removed.
+        if n_padded == n_instances:
+            return cfs
+        # Copy each shard to the host as soon as it is computed, so that the transfers overlap with the remaining shards.
+        shards = sorted(cfs.addressable_shards, key=lambda shard: shard.index[0].start or 0)
+        for shard in shards:
+            shard.data.copy_to_host_async()
+        return jnp.asarray(np.concatenate([np.asarray(shard.data) for shard in shards])[:n_instances])
+
+# %% ../nbs/03_explain.strategy.ipynb 29
+def _next_power_of_2(n: int) -> int:
+    return 1 << (n - 1).bit_length()
+
+def _map_in_buckets(
+    fn: Callable, # Function applied on a batch of `arrays`
+    indices: np.ndarray, # Indices of rows in `arrays` to be processed
+    batch_size: int, # Maximum number of rows in each batch
+    *arrays, # Pytrees of arrays with the same leading dimension
+):
+    """Apply `fn` on `arrays[indices]` batch by batch. 
+    Each batch is padded to a power of two (at most `batch_size`) to bound the number of recompilations.
+    """
+    outputs = []
+    for start in range(0, indices.size, batch_size):
+        idx = indices[start: start + batch_size]
+        pad_size = min(_next_power_of_2(idx.size), batch_size) - idx.size
+        padded_idx = np.concatenate([idx, np.repeat(idx[-1:], pad_size)])
+        out = fn(*jax.tree_util.tree_map(lambda arr: arr[padded_idx], arrays))
+        outputs.append(jax.tree_util.tree_map(lambda o: np.asarray(o)[:idx.size], out))
+    return jax.tree_util.tree_map(lambda *o: np.concatenate(o), *outputs)
+
+# %% ../nbs/03_explain.strategy.ipynb 30
+class EarlyExitStrategy(BaseStrategy):
+    """Generate counterfactuals step by step, and drop instances 
+    which already have valid counterfactuals every `check_every` steps.
+    """
+    def __init__(
+        self, 
+        check_every: int = 10, # Number of steps between two validity checks
+        batch_size: int = None, # Maximum number of active instances in each batch. If None, use one batch.
+    ):
+        if check_every <= 0:
+            raise ValueError(f"`check_every` must be positive, but got check_every={check_every}.")
+        self.check_every = check_every
+        self.batch_size = batch_size
+        self._jitted_fns = collections.OrderedDict()
+
+    def _get_jitted_fns(self, fn: Callable, pred_fn: Callable, **kwargs) -> Tuple[Callable, Callable, Callable]:
+        """Return the jitted `init_fn`, `update_fn` and `final_fn` of the `StepwiseMixedin` module of `fn`."""
+        cf_module = fn.__self__
+
+        def init_fn(xs, y_targets, rng_keys):
+            return jax.vmap(ft.partial(cf_module.init_cf_state, pred_fn=pred_fn, **kwargs))(
+                xs, y_target=y_targets, rng_key=rng_keys)
+        
+        def update_fn(states, xs, y_targets, n_steps):
+            def update_single(state, x, y_target):
+                state = cf_module.update_cf_state(
+                    state, x, pred_fn=pred_fn, y_target=y_target, n_steps=n_steps, **kwargs)
+                cf = cf_module.cf_from_state(state, x, **kwargs)
+                is_valid = jnp.all(pred_fn(cf.reshape(-1, x.shape[-1])).argmax(-1) == y_target.argmax(-1))
+                return state, is_valid
+            return jax.vmap(update_single)(states, xs, y_targets)
+        
+        def final_fn(states, xs):
+            return jax.vmap(ft.partial(cf_module.cf_from_state, **kwargs))(states, xs)
+
+        key = _jit_cache_key(fn, pred_fn, **kwargs)
+        return _lru_get(self._jitted_fns, key, lambda: (jit(init_fn), jit(update_fn), jit(final_fn)))
+
+    def __call__(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> Array: # Generated counterfactual explanations
+        cf_module = getattr(fn, '__self__', None)
+        if not isinstance(cf_module, StepwiseMixedin):
+            warnings.warn(f"`{type(cf_module).__name__}` does not support stepwise generation. "
+                          "Fall back to `VmapStrategy`.")
+            return VmapStrategy()(fn, xs, pred_fn, y_targets, rng_keys, **kwargs)
+
+        init_fn, update_fn, final_fn = self._get_jitted_fns(fn, pred_fn, **kwargs)
+        assert xs.ndim == 2
+        xs, y_targets, rng_keys = map(np.asarray, (xs, y_targets, rng_keys))
+        n_instances, n_steps = xs.shape[0], cf_module.n_steps
+        batch_size = self.batch_size or n_instances
+        active = np.arange(n_instances)
+        states = _map_in_buckets(init_fn, active, batch_size, xs, y_targets, rng_keys)
+        n_steps_done = 0
+        while n_steps_done < n_steps and active.size > 0:
+            n_steps_round = min(self.check_every, n_steps - n_steps_done)
+            _update_fn = ft.partial(update_fn, n_steps=n_steps_round)
+            upt_states, is_valid = _map_in_buckets(_update_fn, active, batch_size, states, xs, y_targets)
+            for leaf, upt_leaf in zip(jax.tree_util.tree_leaves(states), jax.tree_util.tree_leaves(upt_states)):
+                leaf[active] = upt_leaf
+            n_steps_done += n_steps_round
+            # Instances with valid counterfactuals drop out of the computation.
+            active = active[~is_valid]
+        cfs = _map_in_buckets(final_fn, np.arange(n_instances), batch_size, states, xs)
+        return jnp.asarray(cfs)
+
+# %% ../nbs/03_explain.strategy.ipynb 33
+def _parse_cpulist(cpulist: str) -> List[int]:
+    """Parse a cpulist string (e.g., '0-3,8,10-11') into a list of CPU ids."""
+    cpus = []
+    for part in cpulist.strip().split(','):
+        if part == '':
+            continue
+        start, _, end = part.partition('-')
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return cpus
+
+def _numa_node_cpus() -> List[List[int]]:
+    """Return the CPU ids of each NUMA node. Return an empty list if it is unknown."""
+    node_dirs = sorted(
+        glob.glob('/sys/devices/system/node/node[0-9]*'), 
+        key=lambda d: int(re.findall(r'\d+$', d)[0])
+    )
+    node_cpus = []
+    for node_dir in node_dirs:
+        with open(os.path.join(node_dir, 'cpulist')) as f:
+            cpus = _parse_cpulist(f.read())
+        if len(cpus) > 0:
+            node_cpus.append(cpus)
+    return node_cpus
+
+# %% ../nbs/03_explain.strategy.ipynb 34
+def _process_pool_worker(
+    conn, # Connection to the parent process
+    cpus: List[int], # CPUs to pin this worker to. If None, the worker is not pinned
+    cf_module_cls: type, 
+    cf_module_path: str,
+    ml_module_cls: type,
+    ml_module_path: str,
+    data_module_path: str, # If None, the cf module is not hooked up with a data module
+    strategy: str | BaseStrategy,
+):
+    """Load the modules once, and generate counterfactuals for the shards sent by the parent."""
+    if cpus is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    try:
+        cf_module = cf_module_cls.load_from_path(cf_module_path)
+        pred_fn = ml_module_cls.load_from_path(ml_module_path).pred_fn
+        if data_module_path is not None:
+            from relax.data_module import DataModule
+            data_module = DataModule.load_from_path(data_module_path)
+            cf_module.set_data_module(data_module)
+            cf_module.set_apply_constraints_fn(data_module.apply_constraints)
+            cf_module.set_compute_reg_loss_fn(data_module.compute_reg_loss)
+        cf_module.before_generate_cf()
+        strategy = StrategyFactory.get_strategy(strategy)
+        conn.send(('ready', None))
+    except Exception as e:
+        conn.send(('error', e))
+        return
+    
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        xs, y_targets, rng_keys, kwargs = msg
+        try:
+            cfs = strategy(cf_module.generate_cf, xs, pred_fn, y_targets, rng_keys, **kwargs)
+            conn.send(('ok', np.asarray(cfs)))
+        except Exception as e:
+            conn.send(('error', e))
+
+# %% ../nbs/03_explain.strategy.ipynb 35
+class ProcessPoolStrategy(BaseStrategy):
+    """Generate counterfactuals in a pool of worker processes (one per NUMA node by default).
+    The `CFModule` and the module of `pred_fn` are shipped to the workers once via their `save` and `load_from_path`.
+    """
+
+    def __init__(
+        self, 
+        n_workers: int = None, # Number of worker processes. If None, use one worker per NUMA node
+        strategy: str | BaseStrategy = 'vmap', # Strategy to generate counterfactuals in each worker
+        pin_workers: bool = True, # Pin each worker to the CPUs of a NUMA node
+    ):
+        self.node_cpus = _numa_node_cpus()
+        self.n_workers = n_workers or max(len(self.node_cpus), 1)
+        self.strategy = strategy
+        self.pin_workers = pin_workers
+        self._workers = []
+        self._modules = None
+        self._fingerprint = None
+        self._tmp_dir = None
+
+    def _start_workers(self, cf_module, ml_module):
+        self.close()
+        self._tmp_dir = tempfile.mkdtemp()
+        cf_module_path = os.path.join(self._tmp_dir, 'cf_module')
+        ml_module_path = os.path.join(self._tmp_dir, 'ml_module')
+        cf_module.save(cf_module_path)
+        ml_module.save(ml_module_path)
+        data_module_path = None
+        if getattr(cf_module, 'data_module', None) is not None:
+            data_module_path = os.path.join(self._tmp_dir, 'data_module')
+            cf_module.data_module.save(data_module_path)
+        
+        ctx = multiprocessing.get_context('spawn')
+        for i in range(self.n_workers):
+            cpus = None
+            if self.pin_workers and len(self.node_cpus) > 0:
+                cpus = self.node_cpus[i % len(self.node_cpus)]
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_process_pool_worker, 
+                args=(child_conn, cpus, type(cf_module), cf_module_path, type(ml_module), 
+                      ml_module_path, data_module_path, self.strategy),
+                daemon=True
+            )
+            process.start()
+            self._workers.append((process, parent_conn))
+        self._modules = (cf_module, ml_module)
+        for _, conn in self._workers:
+            self._recv(conn)
+
+    def _recv(self, conn):
+        status, result = conn.recv()
+        if status == 'error':
+            raise result
+        return result
+
+    def close(self):
+        """Shut down the worker processes."""
+        for process, conn in self._workers:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            process.join()
+        self._workers = []
+        self._modules = None
+        self._fingerprint = None
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+    def __del__(self):
+        self.close()
+
+    def __call__(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> Array: # Generated counterfactual explanations
+        cf_module = getattr(fn, '__self__', None)
+        ml_module = getattr(pred_fn, '__self__', None)
+        if not hasattr(cf_module, 'load_from_path'):
+            raise ValueError("`fn` must be the `generate_cf` method of a `CFModule`.")
+        if not hasattr(ml_module, 'load_from_path'):
+            raise ValueError("`pred_fn` must be a method of a module which implements "
+                             "`save` and `load_from_path` (e.g., `MLModule.pred_fn`).")
+        # Only (re)start the workers when the modules, their weights or their configs are changed.
+        # If their state cannot be determined, the workers are restarted to ship the current weights.
+        fingerprint = _fns_fingerprint(fn, pred_fn)
+        if (self._modules is None or self._modules[0] is not cf_module or self._modules[1] is not ml_module
+                or fingerprint is None or fingerprint != self._fingerprint):
+            self._start_workers(cf_module, ml_module)
+            self._fingerprint = fingerprint
+        
+        assert xs.ndim == 2
+        xs, y_targets, rng_keys = map(np.asarray, (xs, y_targets, rng_keys))
+        shards = np.array_split(np.arange(xs.shape[0]), len(self._workers))
+        for (_, conn), idx in zip(self._workers, shards):
+            conn.send((xs[idx], y_targets[idx], rng_keys[idx], kwargs))
+        cfs = [self._recv(conn) for _, conn in self._workers]
+        return jnp.concatenate(cfs)
+    
+    __ALL__ = ["__call__", "close"]
+
+# %% ../nbs/03_explain.strategy.ipynb 37
+_logger = logging.getLogger(__name__)
+_STRATEGY_PLANS = collections.OrderedDict()
+# Below this many estimated flops in total, splitting across devices is not worth the overhead.
+_MIN_FLOPS_TO_SHARD = 1e8
+
+def _compiled_flops(compiled) -> float:
+    """Return the estimated flops of a compiled program (0 if unknown)."""
+    cost = compiled.cost_analysis()
+    cost = cost[0] if isinstance(cost, list) else cost
+    return float(cost.get('flops', 0.)) if cost else 0.
+
+# %% ../nbs/03_explain.strategy.ipynb 38
+class AutoStrategy(BaseStrategy):
+    """Choose the strategy and batch size from the compiled cost and memory of `fn`, 
+    the number of instances and the available devices.
+    """
+
+    def __init__(
+        self,
+        memory_fraction: float = 0.5, # Fraction of the available memory to use
+    ):
+        self.memory_fraction = memory_fraction
+
+    def plan(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> BaseStrategy: # The chosen strategy
+        """Plan the strategy. The plan is cached per (method, dataset shape, devices)."""
+        
+        def partial_fn(x, y_target, rng_key):
+            return fn(x, pred_fn=pred_fn, y_target=y_target, rng_key=rng_key, **kwargs)
+
+        def make_plan() -> BaseStrategy:
+            n_instances, n_devices = xs.shape[0], len(devices)
+            probe_size = min(n_instances, 128)
+            shapes = [
+                jax.ShapeDtypeStruct((probe_size, *arr.shape[1:]), arr.dtype) 
+                for arr in (xs, y_targets, rng_keys)
+            ]
+            compiled = jax.jit(jax.vmap(partial_fn)).lower(*shapes).compile()
+            total_flops = _compiled_flops(compiled) / probe_size * n_instances
+            batch_size = _tune_batch_size(
+                fn, xs, pred_fn, y_targets, rng_keys, self.memory_fraction, **kwargs
+            )
+            
+            if batch_size >= n_instances:
+                if n_devices > 1 and n_instances >= n_devices and total_flops >= _MIN_FLOPS_TO_SHARD:
+                    strategy = ShardedStrategy()
+                    reason = f"all instances fit in memory, and ~{total_flops:.3g} flops are split across {n_devices} devices"
+                else:
+                    strategy = VmapStrategy()
+                    reason = f"all instances fit in memory (up to {batch_size} instances per batch)"
+            elif batch_size > 1:
+                strategy = BatchedVmapStrategy(batch_size)
+                reason = f"{n_instances} instances exceed the memory budget; at most {batch_size} instances fit per batch"
+            else:
+                strategy = ScanStrategy()
+                reason = "a single vmapped batch barely fits in memory; generate one instance at a time"
+            
+            _logger.info(
+                f"AutoStrategy chose `{type(strategy).__name__}` for {key[0]} on inputs of shape {xs.shape}: {reason}."
+            )
+            return strategy
+
+        devices = jax.local_devices()
+        key = (_fn_identifier(fn), xs.shape, devices[0].device_kind, len(devices), self.memory_fraction)
+        return _lru_get(_STRATEGY_PLANS, key, make_plan)
+
+    def __call__(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> Array: # Generated counterfactual explanations
+        
+        assert xs.ndim == 2
+        strategy = self.plan(fn, xs, pred_fn, y_targets, rng_keys, **kwargs)
+        return strategy(fn, xs, pred_fn, y_targets, rng_keys, **kwargs)
+    
+    __ALL__ = ["plan", "__call__"]
+
+# %% ../nbs/03_explain.strategy.ipynb 39
 class StrategyFactory(object):
     """Factory class for Parallelism Strategy."""
 
@@ -215,6 +804,9 @@ class StrategyFactory(object):
         'iter': IterativeStrategy(),
         'vmap': VmapStrategy(),
         'pmap': PmapStrategy(),
+        'shard': ShardedStrategy(),
+        'scan': ScanStrategy(),
+        'auto': AutoStrategy(),
     }
 
     def __init__(self) -> None:
@@ -236,3 +828,207 @@ class StrategyFactory(object):
             raise ValueError(f"Invalid strategy: {strategy}")
         
     __ALL__ = ["get_default_strategy", "get_strategy"]
+
+# %% ../nbs/03_explain.strategy.ipynb 43
+class StreamingStrategy(BaseStrategy):
+    """Generate counterfactuals chunk by chunk to bound the peak memory usage."""
+
+    def __init__(
+        self, 
+        chunk_size: int, # Number of instances in each chunk
+        strategy: str | BaseStrategy = 'vmap', # Strategy to generate counterfactuals for each chunk
+    ):
+        if chunk_size <= 0:
+            raise ValueError(f"`chunk_size` must be positive, but got chunk_size={chunk_size}.")
+        self.chunk_size = chunk_size
+        self.strategy = StrategyFactory.get_strategy(strategy)
+
+    def iter_chunks(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array = None, # If None, use `1 - pred_fn(xs)` of each chunk
+        rng_keys: Iterable[jrand.PRNGKey] = None, # If None, derive a key for each instance from `rng_key`
+        rng_key: jrand.PRNGKey = None, # Random number generator key. If None, use the global seed
+        **kwargs
+    ) -> Iterable[Tuple[Array, Array]]: # Yield `(indices, cfs)` for each chunk
+        """Lazily generate counterfactuals for each chunk of `xs`."""
+
+        assert xs.ndim == 2
+        n_instances = xs.shape[0]
+        if rng_keys is None and rng_key is None:
+            rng_key = jrand.PRNGKey(get_config().global_seed)
+        for start in range(0, n_instances, self.chunk_size):
+            end = min(start + self.chunk_size, n_instances)
+            xs_chunk = xs[start:end]
+            if y_targets is None:
+                y_targets_chunk = 1 - pred_fn(xs_chunk)
+            else:
+                y_targets_chunk = y_targets[start:end]
+            if rng_keys is None:
+                # Keys only depend on the instance index, not on `chunk_size`.
+                rng_keys_chunk = jax.vmap(jrand.fold_in, in_axes=(None, 0))(rng_key, jnp.arange(start, end))
+            else:
+                rng_keys_chunk = rng_keys[start:end]
+            cfs = self.strategy(
+                fn, xs_chunk, pred_fn, y_targets_chunk, rng_keys_chunk, **kwargs
+            )
+            yield jnp.arange(start, end), cfs
+
+    def __call__(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> Array: # Generated counterfactual explanations
+        return jnp.concatenate([
+            cfs for _, cfs in self.iter_chunks(fn, xs, pred_fn, y_targets, rng_keys, **kwargs)
+        ])
+    
+    __ALL__ = ["iter_chunks", "__call__"]
+
+# %% ../nbs/03_explain.strategy.ipynb 46
+class BucketedStrategy(BaseStrategy):
+    """Pad inputs to a small set of bucket sizes, so that one compiled program is reused per bucket."""
+
+    def __init__(
+        self, 
+        buckets: Sequence[int] = None, # Bucket sizes. If None, use powers of two up to `max_bucket_size`
+        strategy: str | BaseStrategy = 'vmap', # Strategy to generate counterfactuals in each bucket. It should be traceable by `jax.jit`
+        max_bucket_size: int = 2 ** 16, # The largest bucket size if `buckets` is None
+    ):
+        if buckets is None:
+            buckets = [2 ** i for i in range(int(math.log2(max_bucket_size)) + 1)]
+        if len(buckets) == 0 or min(buckets) <= 0:
+            raise ValueError(f"`buckets` should be a non-empty list of positive integers, but got buckets={buckets}.")
+        self.buckets = sorted(set(buckets))
+        self.strategy = StrategyFactory.get_strategy(strategy)
+        self._jitted_fns = collections.OrderedDict()
+
+    def bucket_size(self, n_instances: int) -> int:
+        """Return the smallest bucket which fits `n_instances`, or the largest bucket."""
+        for bucket in self.buckets:
+            if bucket >= n_instances:
+                return bucket
+        return self.buckets[-1]
+
+    def _get_jitted_fn(self, fn: Callable, pred_fn: Callable, **kwargs) -> Callable:
+        def generate_fn(xs, y_targets, rng_keys):
+            return self.strategy(fn, xs, pred_fn, y_targets, rng_keys, **kwargs)
+        
+        key = _jit_cache_key(fn, pred_fn, **kwargs)
+        return _lru_get(self._jitted_fns, key, lambda: jax.jit(generate_fn))
+
+    def __call__(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> Array: # Generated counterfactual explanations
+        
+        assert xs.ndim == 2
+        jitted_fn = self._get_jitted_fn(fn, pred_fn, **kwargs)
+        n_instances = xs.shape[0]
+        cfs = []
+        # Inputs larger than the largest bucket are split into chunks.
+        for start in range(0, n_instances, self.buckets[-1]):
+            end = min(start + self.buckets[-1], n_instances)
+            bucket = self.bucket_size(end - start)
+            padded = [_pad_rows_to(arr[start:end], bucket) for arr in (xs, y_targets, rng_keys)]
+            # Padded rows are dropped from the outputs.
+            cfs.append(jitted_fn(*padded)[:end - start])
+        return jnp.concatenate(cfs)
+    
+    __ALL__ = ["bucket_size", "__call__"]
+
+# %% ../nbs/03_explain.strategy.ipynb 48
+def _device_put_batch(
+    arrays: Sequence[np.ndarray], # Host arrays to transfer
+    start: int, # Start index of the batch
+    batch_size: int, # Batch size
+    device = None, # Target device. If None, use the default device
+):
+    """Slice a batch from host `arrays`, pad it to `batch_size` rows and transfer it to `device`."""
+    batch = []
+    for arr in arrays:
+        arr = arr[start: start + batch_size]
+        pad_size = batch_size - arr.shape[0]
+        if pad_size > 0:
+            arr = np.concatenate([arr, np.repeat(arr[-1:], pad_size, axis=0)])
+        batch.append(arr)
+    batch = jax.device_put(batch, device)
+    # Block in the background thread so that the transfer is done when the batch is consumed.
+    return jax.block_until_ready(batch)
+
+# %% ../nbs/03_explain.strategy.ipynb 49
+class PipelinedBatchedStrategy(BaseStrategy):
+    """Batched generation which overlaps host-to-device transfers, computation and device-to-host transfers."""
+
+    def __init__(
+        self, 
+        batch_size: int, # Batch size
+        strategy: str | BaseStrategy = 'vmap', # Strategy to generate counterfactuals in each batch. It should be traceable by `jax.jit`
+        prefetch: int = 2, # Number of batches kept in flight in each direction
+    ):
+        if batch_size <= 0:
+            raise ValueError(f"`batch_size` must be positive, but got batch_size={batch_size}.")
+        if prefetch <= 0:
+            raise ValueError(f"`prefetch` must be positive, but got prefetch={prefetch}.")
+        self.batch_size = batch_size
+        self.strategy = StrategyFactory.get_strategy(strategy)
+        self.prefetch = prefetch
+        self._jitted_fns = collections.OrderedDict()
+
+    def _get_jitted_fn(self, fn: Callable, pred_fn: Callable, **kwargs) -> Callable:
+        def generate_fn(xs, y_targets, rng_keys):
+            return self.strategy(fn, xs, pred_fn, y_targets, rng_keys, **kwargs)
+        
+        key = _jit_cache_key(fn, pred_fn, **kwargs)
+        return _lru_get(self._jitted_fns, key, lambda: jax.jit(generate_fn))
+
+    def __call__(
+        self, 
+        fn: Callable, # Function to generate cf for a single input
+        xs: Array, # Input instances to be explained
+        pred_fn: Callable[[Array], Array],
+        y_targets: Array,
+        rng_keys: Iterable[jrand.PRNGKey],
+        **kwargs
+    ) -> Array: # Generated counterfactual explanations
+        
+        assert xs.ndim == 2
+        generate_fn = self._get_jitted_fn(fn, pred_fn, **kwargs)
+        arrays = [np.asarray(arr) for arr in (xs, y_targets, rng_keys)]
+        n_instances, batch_size = xs.shape[0], min(self.batch_size, xs.shape[0])
+        starts = list(range(0, n_instances, batch_size))
+        cfs, pending = [], collections.deque()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            batches = collections.deque(
+                executor.submit(_device_put_batch, arrays, start, batch_size) 
+                for start in starts[:self.prefetch]
+            )
+            for i in range(len(starts)):
+                batch = batches.popleft().result()
+                # Keep the next batches in flight while this batch computes.
+                if i + self.prefetch < len(starts):
+                    batches.append(executor.submit(
+                        _device_put_batch, arrays, starts[i + self.prefetch], batch_size
+                    ))
+                # Dispatch is asynchronous; start copying the outputs back once they are ready.
+                cfs_batch = generate_fn(*batch)
+                cfs_batch.copy_to_host_async()
+                pending.append(cfs_batch)
+                if len(pending) > self.prefetch:
+                    cfs.append(np.asarray(pending.popleft()))
+        cfs.extend(np.asarray(cfs_batch) for cfs_batch in pending)
+        # Padded rows of the last batch are dropped.
+        return jnp.asarray(np.concatenate(cfs)[:n_instances])
+    
+    __ALL__ = ["__call__"]
@@ -9,6 +9,7 @@ from nbdev.showdoc import BasicMarkdownRenderer
 from inspect import isclass
 from fastcore.test import *
 from jax.core import InconclusiveDimensionOperation
+import zlib, lzma
 
 # %% auto 0
 __all__ = ['validate_configs', 'save_pytree', 'load_pytree', 'auto_reshaping', 'grad_update', 'load_json', 'get_config',
@@ -36,31 +37,103 @@ def validate_configs(
 def _is_array(x):
     return isinstance(x, np.ndarray) or isinstance(x, jnp.ndarray) or isinstance(x, list)
 
-def save_pytree(pytree, saved_dir):
+_COMPRESSORS = {'zlib': zlib, 'bz2': bz2, 'lzma': lzma}
+# Leaves are aligned in `data.bin`, so that memory-mapped arrays are aligned.
+_LEAF_ALIGNMENT = 64
+
+def _encode_leaf(x, compression: str = None) -> Tuple[bytes, dict]:
+    """Encode a leaf as bytes, and return its index entry."""
+    arr = np.asarray(x)
+    entry = {'is_array': _is_array(x), 'dtype': arr.dtype.str, 'shape': list(arr.shape)}
+    if arr.dtype.hasobject:
+        entry['encoding'], buf = 'pickle', pickle.dumps(arr)
+    else:
+        entry['encoding'], buf = 'raw', np.ascontiguousarray(arr).tobytes()
+    entry['compression'] = None
+    if compression is not None:
+        compressed = _COMPRESSORS[compression].compress(buf)
+        # Only keep the compressed leaf if it is smaller.
+        if len(compressed) < len(buf):
+            entry['compression'], buf = compression, compressed
+    return buf, entry
+
+def save_pytree(
+    pytree, 
+    saved_dir, 
+    compression: Literal['zlib', 'bz2', 'lzma'] = None # Compress each leaf if it makes the leaf smaller. Compressed leaves cannot be memory-mapped
+):
     """Save a pytree to a directory."""
-    with open(os.path.join(saved_dir, "data.npy"), "wb") as f:
+    if compression is not None and compression not in _COMPRESSORS:
+        raise ValueError(f"Unknown compression: {compression}. Should be one of {list(_COMPRESSORS.keys())}")
+    index = []
+    # Write to temporary files and replace the old ones afterwards. Arrays loaded from `saved_dir` 
+    # might still memory-map the old `data.bin`, which must not be truncated.
+    fd, data_path = tempfile.mkstemp(dir=saved_dir, suffix=".bin.tmp")
+    with os.fdopen(fd, "wb") as f:
         for x in jax.tree_util.tree_leaves(pytree):
-            np.save(f, x)
+            buf, entry = _encode_leaf(x, compression)
+            f.write(b"\0" * (-f.tell() % _LEAF_ALIGNMENT))
+            entry.update(offset=f.tell(), nbytes=len(buf))
+            f.write(buf)
+            index.append(entry)
+    fd, index_path = tempfile.mkstemp(dir=saved_dir, suffix=".json.tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(index, f)
+    os.replace(data_path, os.path.join(saved_dir, "data.bin"))
+    os.replace(index_path, os.path.join(saved_dir, "index.json"))
+    # Remove the stream of the legacy format, which would take precedence when loading.
+    if os.path.exists(os.path.join(saved_dir, "data.npy")):
+        os.remove(os.path.join(saved_dir, "data.npy"))
 
     tree_struct = jax.tree_util.tree_map(lambda t: _is_array(t), pytree)
     with open(os.path.join(saved_dir, "treedef.json"), "w") as f:
         json.dump(tree_struct, f)
 
 # %% ../nbs/00_utils.ipynb 20
-def load_pytree(saved_dir):
-    """Load a pytree from a saved directory."""
-    with open(os.path.join(saved_dir, "treedef.json"), "r") as f:
-        tree_struct = json.load(f)
+def _decode_leaf(f, path: str, entry: dict):
+    """Read a leaf described by its index `entry` from the opened file `f` at `path`."""
+    dtype, shape = np.dtype(entry['dtype']), tuple(entry['shape'])
+    if entry['encoding'] == 'raw' and entry['compression'] is None and entry['is_array'] and entry['nbytes'] > 0:
+        # Memory-map uncompressed arrays: pages are only read when accessed. 
+        # Copy-on-write keeps the loaded arrays writable without touching the file.
+        return np.memmap(path, dtype=dtype, mode='c', offset=entry['offset'], shape=shape)
+    f.seek(entry['offset'])
+    buf = f.read(entry['nbytes'])
+    if entry['compression'] is not None:
+        buf = _COMPRESSORS[entry['compression']].decompress(buf)
+    if entry['encoding'] == 'pickle':
+        arr = pickle.loads(buf)
+    else:
+        arr = np.frombuffer(buf, dtype=dtype).reshape(shape).copy()
+    return arr if entry['is_array'] else arr.item()
 
-    leaves, treedef = jax.tree_util.tree_flatten(tree_struct)
+def _load_legacy_pytree(saved_dir, leaves: list) -> list:
+    """Load the leaves stored back-to-back in `data.npy` (the format before `index.json`)."""
     with open(os.path.join(saved_dir, "data.npy"), "rb") as f:
-        flat_state = [
+        return [
             np.load(f, allow_pickle=True) if is_arr else np.load(f, allow_pickle=True).item()
             for is_arr in leaves
         ]
+
+def load_pytree(saved_dir):
+    """Load a pytree from a saved directory. Uncompressed arrays are memory-mapped, 
+    so that only the leaves which are accessed are read from the disk.
+    """
+    with open(os.path.join(saved_dir, "treedef.json"), "r") as f:
+        tree_struct = json.load(f)
+
+    leaves, treedef = jax.tree_util.tree_flatten(tree_struct)
+    if not os.path.exists(os.path.join(saved_dir, "index.json")):
+        return jax.tree_util.tree_unflatten(treedef, _load_legacy_pytree(saved_dir, leaves))
+    
+    with open(os.path.join(saved_dir, "index.json"), "r") as f:
+        index = json.load(f)
+    path = os.path.join(saved_dir, "data.bin")
+    with open(path, "rb") as f:
+        flat_state = [_decode_leaf(f, path, entry) for entry in index]
     return jax.tree_util.tree_unflatten(treedef, flat_state)
 
-# %% ../nbs/00_utils.ipynb 25
+# %% ../nbs/00_utils.ipynb 28
 def _reshape_x(x: Array):
     x_size = x.shape
     if len(x_size) > 1 and x_size[0] != 1:
@@ -72,7 +145,7 @@ but got `x.shape` = {x.shape}. This method expects a single input instance."""
         x = x.reshape(1, -1)
     return x, x_size
 
-# %% ../nbs/00_utils.ipynb 26
+# %% ../nbs/00_utils.ipynb 29
 def auto_reshaping(
     reshape_argname: str, # The name of the argument to be reshaped.
     reshape_output: bool = True, # Whether to reshape the output. Useful to set `False` when returning multiple cfs.
@@ -107,7 +180,7 @@ def auto_reshaping(
         return wrapper
     return decorator
 
-# %% ../nbs/00_utils.ipynb 31
+# %% ../nbs/00_utils.ipynb 34
 def grad_update(
     grads, # A pytree of gradients.
     params, # A pytree of parameters.
@@ -118,13 +191,135 @@ def grad_update(
     upt_params = optax.apply_updates(params, updates)
     return upt_params, opt_state
 
-# %% ../nbs/00_utils.ipynb 33
+# %% ../nbs/00_utils.ipynb 36
 def load_json(f_name: str) -> Dict[str, Any]:  # file name
     with open(f_name) as f:
         return json.load(f)
 
 
-# %% ../nbs/00_utils.ipynb 35
+# %% ../nbs/00_utils.ipynb 38
+_SCALAR_TYPES = (type(None), bool, int, float, complex, str, bytes, np.generic)
+_FUNCTION_TYPES = (types.FunctionType, types.MethodType, types.BuiltinFunctionType, ft.partial, np.ufunc)
+# Objects of these packages are described by their attributes
+_DESCRIBED_PACKAGES = ('relax', 'haiku', 'optax')
+
+def _concat_states(states: list) -> list | None:
+    """Concatenate states, or return `None` if any of them is unknown."""
+    if any(state is None for state in states):
+        return None
+    return sum(states, [])
+
+def _value_state(value, seen: dict) -> list | None:
+    """Describe `value` and the weights it holds, or return `None` if unknown."""
+    if isinstance(value, _SCALAR_TYPES + (np.ndarray, jax.Array)):
+        return [value]
+    if isinstance(value, keras.Variable):
+        return [np.asarray(value)]
+    if id(value) in seen:
+        # Already described (e.g., the owner of a bound method)
+        return [type(value).__name__]
+    # Keep a reference, so that the id is not reused by another object
+    seen[id(value)] = value
+    leaves, treedef = jax.tree_util.tree_flatten(value)
+    if not jax.tree_util.treedef_is_leaf(treedef):
+        return _concat_states([[str(treedef)]] + [_value_state(leaf, seen) for leaf in leaves])
+    if isinstance(value, (type, types.ModuleType)):
+        return [value.__name__]
+    if isinstance(value, BaseParser):
+        return [type(value).__name__, value.json()]
+    if isinstance(value, keras.random.SeedGenerator):
+        return [np.asarray(value.state)]
+    if isinstance(value, keras.layers.Layer):
+        return [type(value).__name__] + value.get_weights()
+    if hasattr(value, 'features') and hasattr(value, 'xs'):
+        # Constraints of a `DataModule` are fully determined by its features
+        return [(feat.name, feat.transformation.name, feat.is_immutable) for feat in value.features]
+    if isinstance(value, _FUNCTION_TYPES) or hasattr(value, '__wrapped__'):
+        return _fn_state(value, seen)
+    # Subclasses of their classes (e.g., user-defined `CFModule`s) are described as well
+    if any(cls.__module__.split('.')[0] in _DESCRIBED_PACKAGES for cls in type(value).__mro__) and hasattr(value, '__dict__'):
+        return _module_state(value, seen)
+    return None
+
+def _module_state(obj, seen: dict = None) -> list | None:
+    """Describe the attributes of `obj` and the weights they hold, or return `None` if unknown."""
+    seen = {} if seen is None else seen
+    seen[id(obj)] = obj
+    states = [[type(obj).__name__]]
+    for name, attr in sorted(vars(obj).items()):
+        state = _value_state(attr, seen)
+        states.append(None if state is None else [name] + state)
+    return _concat_states(states)
+
+def _code_names(code: types.CodeType) -> set:
+    """Names of the globals and attributes referenced by `code` and its nested functions."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+def _globals_state(fn: types.FunctionType, seen: dict) -> list | None:
+    """Describe the global variables referenced by `fn`."""
+    states = []
+    for name in sorted(_code_names(fn.__code__) & fn.__globals__.keys()):
+        value = fn.__globals__[name]
+        if isinstance(value, types.FunctionType):
+            # Other functions are only identified by their code
+            states.append([name, value.__module__, value.__qualname__, value.__code__.co_code])
+        elif isinstance(value, (type, types.ModuleType)) or getattr(value, '__module__', None) == 'typing':
+            states.append([name])
+        else:
+            state = _value_state(value, seen)
+            states.append(None if state is None else [name] + state)
+    return _concat_states(states)
+
+def _fn_state(fn: Callable, seen: dict = None) -> list | None:
+    """Return a description of `fn` and the weights it depends on, or `None` if unknown."""
+    seen = {} if seen is None else seen
+    if fn is None:
+        return []
+    if isinstance(fn, types.MethodType):
+        return _concat_states([_fn_state(fn.__func__, seen), _value_state(fn.__self__, seen)])
+    # Unwrap `jax.jit` and other decorators
+    while hasattr(fn, '__wrapped__'):
+        fn = fn.__wrapped__
+    if isinstance(fn, ft.partial):
+        return _concat_states([_fn_state(fn.func, seen), _value_state([fn.args, fn.keywords], seen)])
+    name = [getattr(fn, '__module__', None), getattr(fn, '__qualname__', type(fn).__name__)]
+    if isinstance(fn, types.FunctionType):
+        try:
+            cells = [cell.cell_contents for cell in fn.__closure__ or ()]
+        except ValueError: # Empty cell
+            return None
+        # Weights captured by the closure, the default arguments, or the referenced globals are part of the state
+        return _concat_states([
+            name, [fn.__code__.co_code], 
+            _value_state([fn.__defaults__, fn.__kwdefaults__, cells], seen),
+            _globals_state(fn, seen)
+        ])
+    if isinstance(fn, (types.BuiltinFunctionType, np.ufunc)):
+        return name
+    return _value_state(fn, seen)
+
+def _hash_state(state: list) -> str:
+    """Hash a list of strings and arrays."""
+    sha = hashlib.sha256()
+    for leaf in state:
+        if isinstance(leaf, (np.ndarray, jax.Array)):
+            leaf = np.asarray(leaf)
+            sha.update(f"{leaf.dtype}{leaf.shape}".encode())
+            sha.update(np.ascontiguousarray(leaf).tobytes())
+        else:
+            sha.update(repr(leaf).encode())
+    return sha.hexdigest()
+
+def _fns_fingerprint(*fns: Callable, **kwargs) -> str | None:
+    """Hash the code, configs and weights behind `fns` and the values of `kwargs`, or return `None` if unknown."""
+    state = _concat_states([_fn_state(fn) for fn in fns] + [_value_state([kwargs], {})])
+    return None if state is None else _hash_state(state)
+
+# %% ../nbs/00_utils.ipynb 41
 @dataclass
 class Config:
     rng_reserve_size: int
@@ -136,11 +331,11 @@ class Config:
 
 main_config = Config.default()
 
-# %% ../nbs/00_utils.ipynb 36
+# %% ../nbs/00_utils.ipynb 42
 def get_config() -> Config: 
     return main_config
 
-# %% ../nbs/00_utils.ipynb 37
+# %% ../nbs/00_utils.ipynb 43
 def set_config(
     *,
     rng_reserve_size: int = None, # The number of random number generators to reserve.